@@ -7,8 +7,11 @@ from rich.logging import RichHandler
 
 from meetchecker.core import run
 from meetchecker.daemon import Daemon
+from meetchecker.datasourcing import READERS
 from meetchecker.files import DotFile
 from meetchecker.files import Locations
+from meetchecker.filters import Filters
+from meetchecker.registry import CheckerRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +35,87 @@ def parse_args():
     parser.add_argument(
         "-i", "--interval", type=int, default=120, help="Refresh interval in seconds"
     )
+    parser.add_argument(
+        "--content-hash",
+        action="store_true",
+        default=False,
+        help="In daemon mode, also hash the database to detect changes, not just size and mtime",
+    )
+    parser.add_argument(
+        "--dump-dir",
+        type=pathlib.Path,
+        default=None,
+        help="Also write the tables exported by mdb-export as csv files to this directory, for debugging",
+    )
+    parser.add_argument(
+        "--reader",
+        choices=READERS,
+        default="mdb-export",
+        help="How to read the database: with mdbtools' mdb-export, or in-process (falls back to mdb-export)",
+    )
+    parser.add_argument(
+        "--no-table-cache",
+        action="store_false",
+        dest="table_cache",
+        default=True,
+        help="Stream each table straight from mdb-export into the parser, so its text is never "
+        "held in memory, at the cost of parsing every table on each refresh (the table cache "
+        "needs each table's text to tell whether it changed)",
+    )
+    parser.add_argument(
+        "--no-result-cache",
+        action="store_false",
+        dest="result_cache",
+        default=True,
+        help="Re-run every check and re-render every event in full on each refresh, "
+        "rather than reusing unchanged results",
+    )
+    parser.add_argument(
+        "--export-workers",
+        type=int,
+        default=None,
+        help="Max number of tables to export from the database at once (default: all of them)",
+    )
+    parser.add_argument(
+        "--check-workers",
+        type=int,
+        default=None,
+        help="Number of checkers to run at once (default: one at a time)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=False,
+        help="In daemon mode, only re-check the swims changed since the last refresh",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Time each stage of every run, and write the timings to <output>_profile.json",
+    )
+    parser.add_argument(
+        "--profile-runs",
+        type=int,
+        default=50,
+        help="In daemon mode with --profile, also keep the last N runs' timings in "
+        "<output>_profile_log.json (default: 50, 0 for none)",
+    )
+    parser.add_argument(
+        "--team",
+        default=None,
+        help="Only check the swims of these teams, eg. RC or RC,WH",
+    )
+    parser.add_argument(
+        "--events",
+        default=None,
+        help="Only check these events, eg. 1-20 or 1-20,25",
+    )
+    parser.add_argument(
+        "--sessions",
+        default=None,
+        help="Only check the events in these sessions, eg. 2 or 1-2",
+    )
     parser.add_argument(
         "-q",
         "--quiet",
@@ -78,11 +162,39 @@ def main():
 
     with open(checks_file) as f:
         checks = yaml.safe_load(f)
+    # resolved once up front, so that a bad checks config stops here rather than mid-run
+    try:
+        checks = CheckerRegistry(checks)
+    except ValueError as ex:
+        logger.error(f"{checks_file}: {ex}")
+        raise SystemExit(1)
 
+    run_options = dict(
+        dump_dir=args.dump_dir,
+        table_cache=args.table_cache,
+        reader=args.reader,
+        export_workers=args.export_workers,
+        check_workers=args.check_workers,
+        result_cache=args.result_cache,
+    )
+    filters = Filters(teams=args.team, events=args.events, sessions=args.sessions)
+    if filters:
+        run_options["filters"] = filters
+    if args.profile:
+        run_options["profile"] = output.with_name(f"{output.stem}_profile.json")
     if args.daemon:
-        Daemon(database, output, checks, args.interval).run()
+        Daemon(
+            database,
+            output,
+            checks,
+            args.interval,
+            content_hash=args.content_hash,
+            incremental=args.incremental,
+            profile_runs=args.profile_runs,
+            **run_options,
+        ).run()
     else:
-        run(database, output, checks)
+        run(database, output, checks, **run_options)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,207 @@
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import glob
+import logging
+import os
+import pathlib
+import time
+
+import yaml
+from rich.logging import RichHandler
+
+from meetchecker.core import reversed_report_path, run_checks, write_reports
+from meetchecker.datasourcing import READERS, get_data
+from meetchecker.files import DotFile, Locations
+from meetchecker.registry import CheckerRegistry
+from meetchecker.report import create_index_page
+
+logger = logging.getLogger(__name__)
+
+# Checks many meet databases at once, eg. to re-audit a whole season: each meet is read and
+# checked in a worker process, which writes its reports, and an index page links to them all.
+
+
+def find_databases(source):
+    # the .mdb files in a directory, or matching a glob pattern
+    path = pathlib.Path(source)
+    if path.is_dir():
+        return sorted(path.glob("*.mdb"))
+    return sorted(pathlib.Path(match) for match in glob.glob(source))
+
+
+def report_names(databases):
+    # each database's report file name, from its stem, or its directory and stem if another
+    # database has the same stem (eg. spring/meet.mdb and summer/meet.mdb), numbered if even
+    # that is not enough
+    stems = Counter(database.stem for database in databases)
+    names = [
+        (
+            database.stem
+            if stems[database.stem] == 1
+            else f"{database.parent.name}_{database.stem}"
+        )
+        for database in databases
+    ]
+    counts, seen = Counter(names), Counter()
+    for i, name in enumerate(names):
+        if counts[name] > 1:
+            seen[name] += 1
+            names[i] = f"{name}_{seen[name]}"
+    return [f"{name}.html" for name in names]
+
+
+def check_meet(database, output, checks, reader="mdb-export"):
+    # runs in a worker process, so only a small summary of the meet goes back to the parent
+    start = time.perf_counter()
+    summary = dict(database=database.name)
+    try:
+        registry = CheckerRegistry.of(checks)
+        data = get_data(database, cache=None, reader=reader, checks=registry)
+        check_results = run_checks(data, registry, cache=None)
+        # no meet is checked twice, so there is nothing to reuse
+        write_reports(check_results, database, output, cache=None)
+    except Exception as ex:
+        # one bad database should not stop the rest of the season being checked
+        logger.error(f"Failed to check {database} with exception: {ex}")
+        summary["error"] = f"{type(ex).__name__}: {ex}"
+        return summary
+    counts = check_results.frame.check_name.value_counts(sort=False)
+    summary.update(
+        report=output.name,
+        reversed_report=reversed_report_path(output).name,
+        swims=len(data["entry"].index),
+        results=len(check_results),
+        results_by_check={name: int(count) for name, count in counts.items()},
+        seconds=round(time.perf_counter() - start, 3),
+    )
+    return summary
+
+
+def run_meets(meets, jobs):
+    # check_meet for each of meets (its args), `jobs` at a time, giving the summaries of those
+    # which finished by their position in meets.  A worker dying (eg. killed for using too
+    # much memory) breaks the whole pool, so the meets it had not finished are left out
+    summaries = {}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(check_meet, *args) for args in meets]
+        for i, future in enumerate(futures):
+            try:
+                summaries[i] = future.result()
+            except BrokenProcessPool:
+                pass
+    return summaries
+
+
+def batch(databases, output_dir, checks, jobs=None, reader="mdb-export"):
+    # at most `jobs` meets are read and checked at once (default: one per cpu), which bounds
+    # memory use however many databases there are.  Returns the summaries in database order
+    jobs = jobs or os.cpu_count() or 1
+    logger.info(f"Checking {len(databases)} meets, {jobs} at a time")
+    meets = [
+        (database, output_dir / name, checks, reader)
+        for database, name in zip(databases, report_names(databases))
+    ]
+    finished = run_meets(meets, jobs)
+    unfinished = [i for i in range(len(meets)) if i not in finished]
+    if unfinished:
+        # which meet's worker died is unknown, so each unfinished meet is retried once in a
+        # pool of its own, and only those whose worker dies again are failed
+        logger.warning(
+            f"A worker died, checking {len(unfinished)} unfinished meets again one at a time"
+        )
+    for i in unfinished:
+        summary = run_meets([meets[i]], 1).get(0)
+        if summary is None:
+            database = databases[i]
+            logger.error(f"Failed to check {database}, its worker died")
+            summary = dict(
+                database=database.name,
+                error="BrokenProcessPool: the worker checking this meet died",
+            )
+        finished[i] = summary
+    summaries = [finished[i] for i in range(len(meets))]
+    for database, summary in zip(databases, summaries):
+        if "error" not in summary:
+            logger.info(
+                f"{database.name}: {summary['results']} results for "
+                f"{summary['swims']} swims ({summary['seconds']:.1f}s)"
+            )
+    index = output_dir / "index.html"
+    create_index_page(summaries, index)
+    logger.info(f"Wrote index of {len(summaries)} meets to {index}")
+    return summaries
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Check every meet database in a directory, or matching a glob pattern"
+    )
+    parser.add_argument("source", help="Directory of .mdb files, or a glob pattern")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=pathlib.Path,
+        required=True,
+        help="Directory for the reports and their index.html",
+    )
+    parser.add_argument(
+        "--dotfile", default=pathlib.Path("~/.meetchecker.yaml").expanduser()
+    )
+    parser.add_argument("--checks", default=None)
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of meets to check at once (default: one per cpu)",
+    )
+    parser.add_argument(
+        "--reader",
+        choices=READERS,
+        default="mdb-export",
+        help="How to read the databases: mdb-export, or the in-process python reader",
+    )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        help="Only warnings or errors",
+        action="store_const",
+        dest="loglevel",
+        const=logging.WARNING,
+        default=logging.INFO,
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(
+        level=args.loglevel,
+        format="%(message)s",
+        datefmt="[%X]",
+        handlers=[RichHandler()],
+    )
+    databases = find_databases(args.source)
+    if not databases:
+        raise ValueError(f"No meet databases found for {args.source!r}")
+    if not args.output.is_dir():
+        raise ValueError(f"Path {args.output} is not a directory")
+
+    dotfile = DotFile(args.dotfile)
+    checks_file = Locations(dotfile.workdir).resolve_checks(args.checks, dotfile.checks)
+    with open(checks_file) as f:
+        checks = yaml.safe_load(f)
+    # validated here once, so that a bad checks config stops the batch before it starts
+    try:
+        CheckerRegistry(checks)
+    except ValueError as ex:
+        logger.error(f"{checks_file}: {ex}")
+        raise SystemExit(1)
+
+    batch(databases, args.output, checks, jobs=args.jobs, reader=args.reader)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import json
+import logging
+import pathlib
+import tempfile
+import time
+
+from meetchecker.core import run_checks
+from meetchecker.datasourcing import (
+    dump_tables,
+    load_tables_from_csvs,
+    post_process_dataframes,
+    tables_to_dataframes,
+)
+from meetchecker.registry import CheckerRegistry
+from meetchecker.report import create_html_reports
+from meetchecker.synthetic import synthetic_tables
+
+logger = logging.getLogger(__name__)
+
+# every shipped checker, set up for the time standards and records of a synthetic meet
+CHECKS = dict(
+    popped_county=dict(
+        checker="meetchecker.checkers.popped_time_standard",
+        params=dict(time_standard="CNTY"),
+    ),
+    bettered_lsc_time=dict(
+        checker="meetchecker.checkers.compare_vs_time_standard",
+        params=dict(time_standard="LSC"),
+    ),
+    new_pool_record=dict(
+        checker="meetchecker.checkers.set_new_record",
+        params=dict(record_name="2022pool"),
+    ),
+    big_pop=dict(
+        checker="meetchecker.checkers.popped_by_percent_threshold",
+        params=dict(threshold=20.0),
+    ),
+    big_disimprovement=dict(
+        checker="meetchecker.checkers.disimproved_by_percent_threshold",
+        params=dict(threshold=20.0),
+    ),
+    only_one_pad_time=dict(
+        checker="meetchecker.checkers.only_n_or_fewer_pad_times",
+        params=dict(n=1),
+    ),
+    two_pad_times_and_inconsistent=dict(
+        checker="meetchecker.checkers.two_pad_times_and_inconsistent",
+        params=dict(threshold=0.3),
+    ),
+    incorrect_averaging=dict(
+        checker="meetchecker.checkers.incorrect_averaging_of_two_pad_times",
+        params=dict(threshold=0.1),
+    ),
+    relays=dict(checker="meetchecker.checkers.is_a_relay"),
+    all_in_heat_popped=dict(
+        checker="meetchecker.checkers.all_in_heat_popped",
+        params=dict(min_swimmers=5),
+    ),
+    all_in_heat_missing_pad_times=dict(
+        checker="meetchecker.checkers.all_in_heat_missing_pad_times",
+        params=dict(min_swimmers=3),
+    ),
+)
+SIZES = [1000, 10000, 100000]
+
+
+def best_of(repeat, fn):
+    # the fastest of repeat calls, and the result of the last one
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def benchmark(swims, repeat=3, checks=CHECKS, seed=0):
+    # seconds for each stage of checking a synthetic meet of about `swims` swims, read from
+    # csv files just as get_data_from_csvs does
+    registry = CheckerRegistry(checks)
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir)
+        dump_tables(synthetic_tables(swims, seed=seed), path)
+        timings["read_csvs"], dataframes = best_of(
+            repeat, lambda: tables_to_dataframes(load_tables_from_csvs(path))
+        )
+        timings["post_process_dataframes"], data = best_of(
+            repeat, lambda: post_process_dataframes(dataframes)
+        )
+        for name, checker in registry.checkers:
+            timings[f"checker:{name}"], _ = best_of(repeat, lambda: checker.run(data))
+        timings["run_checks"], results = best_of(
+            repeat, lambda: run_checks(data, registry)
+        )
+        timings["by_event"], events = best_of(repeat, results.by_event)
+        timings["create_html_reports"], _ = best_of(
+            repeat,
+            lambda: create_html_reports(
+                events,
+                meetfile="synthetic",
+                output=path / "report.html",
+                reversed_output=path / "report_rev.html",
+            ),
+        )
+    return dict(
+        swims=len(data["entry"].index),
+        results=len(results),
+        seconds={stage: round(seconds, 4) for stage, seconds in timings.items()},
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Time meetchecker's stages on synthetic meets of different sizes"
+    )
+    parser.add_argument(
+        "--swims",
+        type=int,
+        nargs="+",
+        default=SIZES,
+        help="Meet sizes to benchmark, in swims (default: 1k, 10k and 100k)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Report the best of this many runs"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--json",
+        type=pathlib.Path,
+        default=None,
+        help="Also write the timings to this file, eg. to compare against later",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    reports = []
+    for swims in args.swims:
+        report = benchmark(swims, repeat=args.repeat, seed=args.seed)
+        reports.append(report)
+        print(f"\n{report['swims']} swims, {report['results']} check results")
+        for stage, seconds in report["seconds"].items():
+            print(f"  {stage:<45} {seconds:>9.4f}s")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
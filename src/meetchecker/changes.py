@@ -0,0 +1,46 @@
+from collections import namedtuple
+import hashlib
+import logging
+import pathlib
+
+logger = logging.getLogger(__name__)
+
+
+Fingerprint = namedtuple("Fingerprint", "size mtime_ns digest")
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ChangeDetector:
+    def __init__(self, path, use_hash=False):
+        self.path = pathlib.Path(path)
+        self.use_hash = use_hash
+        self.last = None
+
+    def fingerprint(self):
+        # the digest is only added by check, when the size and mtime alone have changed
+        stat = self.path.stat()
+        return Fingerprint(stat.st_size, stat.st_mtime_ns, None)
+
+    def check(self):
+        # returns True if the file has changed since the last check (or was never checked),
+        # remembering the new fingerprint either way
+        current = self.fingerprint()
+        last = self.last
+        if last and (current.size, current.mtime_ns) == (last.size, last.mtime_ns):
+            return False
+        if self.use_hash:
+            current = current._replace(digest=file_digest(self.path))
+        self.last = current
+        if last is None:
+            return True
+        if self.use_hash and current.digest == last.digest:
+            logger.debug(f"{self.path} was touched but its content is unchanged")
+            return False
+        return True
@@ -1,29 +1,142 @@
-import dataclasses
-
-
-@dataclasses.dataclass
-class CheckRecord:
-    event_no: int
-    fin_heat: int
-    fin_lane: int
-    event_name: str
-    athlete_name: str
-    team_abbr: str
-    event_stroke: str
-    event_dist: int
-    actualseed_time: float
-    num_pad_times: int
-    fin_time: float
-    fin_pad: float
-    check_name: str
-    reason: str
-    color: str
+from collections import namedtuple
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# the columns of a swim kept in the check results, then those describing each exception
+SWIM_COLUMNS = [
+    "event_no",
+    "fin_heat",
+    "fin_lane",
+    "event_name",
+    "athlete_name",
+    "team_abbr",
+    "event_stroke",
+    "event_dist",
+    "actualseed_time",
+    "num_pad_times",
+    "fin_time",
+    "fin_pad",
+]
+CHECK_COLUMNS = ["check_name", "reason", "color"]
+LANE_KEY = ["event_no", "fin_heat", "fin_lane"]
+
+NameReasonColor = namedtuple("NameReason", "name reason color")
+
+
+class LaneResult:
+    # a view of one lane's exceptions, made only when a report is written
+    __slots__ = SWIM_COLUMNS + ["name_reasons"]
+
+    def __init__(self, name_reasons, **swim):
+        for column in SWIM_COLUMNS:
+            setattr(self, column, swim[column])
+        self.name_reasons = name_reasons
+
+    def num_exceptions(self):
+        return len(self.name_reasons)
+
+    def checks_as_str(self):
+        return "\n".join([f"    * {nr.name}: {nr.reason}" for nr in self.name_reasons])
+
+
+class CheckResults:
+    # the exceptions found by the checks, one row per check per swim, held column-wise in
+    # a single frame rather than as an object per row
+    def __init__(self, frame=None):
+        if frame is None:
+            frame = pd.DataFrame(columns=SWIM_COLUMNS + CHECK_COLUMNS)
+        self.frame = frame
 
     @classmethod
-    def from_records(cls, records, color=None):
-        retv = []
-        names = set([f.name for f in dataclasses.fields(cls)])
-        for record in records:
-            kwargs = {k: v for k, v in record.items() if k in names}
-            retv.append(cls(color=color, **kwargs))
-        return retv
+    def from_checked(cls, rows, color=None):
+        # rows are a checker's output: the flagged swims with check_name and reason added;
+        # row_key is kept when present, for incremental runs
+        columns = SWIM_COLUMNS + ["check_name", "reason"]
+        if "row_key" in rows:
+            columns.append("row_key")
+        frame = rows.reindex(columns=columns).assign(color=color)
+        return cls(frame.reset_index(drop=True))
+
+    @classmethod
+    def concat(cls, results):
+        frames = [result.frame for result in results if len(result)]
+        if not frames:
+            return cls()
+        return cls(pd.concat(frames, ignore_index=True))
+
+    def __len__(self):
+        return len(self.frame.index)
+
+    def by_lane(self, reverse=False):
+        # LaneResults in event, heat and lane order (latest event first if reverse), each
+        # holding the lane's exceptions in the order they were found
+        frame = self.sorted_frame(reverse)
+        return lane_results(frame, group_starts(frame, LANE_KEY))
+
+    def by_event(self):
+        # (digest, LaneResults) for each event, in event order.  The digest covers all of the
+        # event's exceptions and their swims, so equal digests mean identical results, eg. to
+        # reuse what was rendered from them
+        frame = self.sorted_frame()
+        lane_starts = group_starts(frame, LANE_KEY)
+        lanes = lane_results(frame, lane_starts)
+        hashes = pd.util.hash_pandas_object(
+            frame[SWIM_COLUMNS + CHECK_COLUMNS], index=False
+        ).to_numpy()
+        event_starts = group_starts(frame, ["event_no"])
+        event_ends = np.r_[event_starts[1:], len(frame.index)].astype(int)
+        # every event starts with a lane, so this finds the lanes of each event
+        first_lanes = np.searchsorted(lane_starts, event_starts)
+        last_lanes = np.r_[first_lanes[1:], len(lanes)].astype(int)
+        return [
+            (
+                hashlib.blake2b(
+                    hashes[start:end].tobytes(), digest_size=16
+                ).hexdigest(),
+                lanes[first:last],
+            )
+            for start, end, first, last in zip(
+                event_starts.tolist(),
+                event_ends.tolist(),
+                first_lanes.tolist(),
+                last_lanes.tolist(),
+            )
+        ]
+
+    def sorted_frame(self, reverse=False):
+        # the frame in event (reversed if reverse), heat and lane order, keeping the order
+        # the exceptions were found in for each lane
+        frame = self.frame.assign(order=np.arange(len(self)))
+        return frame.sort_values(
+            LANE_KEY + ["order"], ascending=[not reverse, True, True, True]
+        )
+
+
+def group_starts(frame, columns):
+    # positions of the first row of each run of equal values of columns
+    keys = frame[columns].to_numpy()
+    if not len(keys):
+        return np.array([], dtype=int)
+    return np.flatnonzero(np.r_[True, (keys[1:] != keys[:-1]).any(axis=1)])
+
+
+def lane_results(frame, starts):
+    swims = {column: frame[column].tolist() for column in SWIM_COLUMNS}
+    name_reasons = list(
+        map(
+            NameReasonColor,
+            frame["check_name"].tolist(),
+            frame["reason"].tolist(),
+            frame["color"].tolist(),
+        )
+    )
+    ends = np.r_[starts[1:], len(frame.index)].astype(int)
+    return [
+        LaneResult(
+            name_reasons[start:end],
+            **{column: values[start] for column, values in swims.items()},
+        )
+        for start, end in zip(starts.tolist(), ends.tolist())
+    ]
@@ -0,0 +1,20 @@
+from .base import HeatChecker
+from ..utils import emphasis as _
+
+
+class Checker(HeatChecker):
+    columns = HeatChecker.columns + ["num_pad_times"]
+
+    def reason_template(self, rows):
+        return (
+            "".join(
+                [
+                    _("None of the {heat_swimmers} swimmers"),
+                    " in the heat got electronic times, was the timing system recording?",
+                ]
+            ),
+            {},
+        )
+
+    def matches(self, data, expressions):
+        return data["entry"].num_pad_times == 0
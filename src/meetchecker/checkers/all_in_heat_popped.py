@@ -0,0 +1,24 @@
+from .base import HeatChecker
+from ..utils import emphasis as _
+
+
+class Checker(HeatChecker):
+    columns = HeatChecker.columns + ["popped_by"]
+
+    def reason_template(self, rows):
+        return (
+            "".join(
+                [
+                    _("All {heat_swimmers} swimmers"),
+                    " in the heat popped their seed times, could this be the wrong heat or file?",
+                ]
+            ),
+            {},
+        )
+
+    def in_scope(self, data, expressions):
+        # swims with both a seed and a final time
+        return expressions.eligible & data["entry"].popped_by.notna()
+
+    def matches(self, data, expressions):
+        return expressions.popped
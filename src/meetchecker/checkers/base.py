@@ -1,12 +1,112 @@
+from meetchecker.engine import STATUS_COLUMNS, Expressions, heat_counts
+from meetchecker.filters import Filters
+from meetchecker.utils import format_reasons
+
+
 class BaseChecker:
+    # whether a row's condition depends only on that row (and its event's standards / records),
+    # so that incremental runs can re-check just the rows which changed
+    row_local = True
+    # the columns of data["entry"] the checker reads, besides those shown in its results
+    # (check.SWIM_COLUMNS); None if it does not say, when all of them are taken to matter
+    columns = None
+
     def __init__(self, **kwargs):
         self.name = kwargs.get("name", "Unnamed Checker")
         self.color = kwargs.get("color")
+        # team_filter / event_filter / session_filter params restrict the check to some swims
+        self.filters = Filters.from_params(kwargs)
+
+    def condition(self, data, expressions):
+        # checkers which can express their check as a boolean mask over data["entry"] return
+        # it here, so that run_checks can evaluate all of them together in one pass, sharing
+        # expressions.  Checkers which cannot override check() instead.
+        raise NotImplementedError
+
+    def flags(self, data, expressions):
+        # the condition, restricted to the swims passing the checker's filters
+        if not self.filters:
+            return self.condition(data, expressions)
+        return self.condition(data, expressions) & self.filters.mask(data)
+
+    def select(self, data, rows):
+        # the flagged rows of data["entry"], plus any further columns get_reason needs
+        return rows
+
+    def check(self, data):
+        entry = data["entry"]
+        return self.select(data, entry.loc[self.flags(data, Expressions(data))])
+
+    def reason_template(self, rows):
+        # checkers can return a str.format template for their reason, plus a dict of any
+        # extra columns / values it uses, to have the reasons for all rows formatted at once
+        # (see utils.format_reasons).  Returning None falls back to get_reason(row) per row
+        return None
+
+    def inputs(self, data):
+        # everything the checker's flags and reasons depend on, other than its settings and
+        # the shown columns, as a frame aligned with data["entry"]: its results can be reused
+        # while this is unchanged.  None if they depend on more than data, never to be reused
+        entry = data["entry"]
+        inputs = entry if self.columns is None else entry[self.columns]
+        if self.filters:
+            inputs = inputs.assign(passes_filters=self.filters.mask(data))
+        return inputs
+
+    def has_condition(self):
+        return type(self).condition is not BaseChecker.condition
 
     def run(self, data):
-        filtered = self.check(data).copy()
+        return self.add_reasons(self.check(data).copy())
+
+    def add_reasons(self, filtered):
         if len(filtered.index) == 0:
             return
         filtered["check_name"] = self.name
-        filtered["reason"] = filtered.apply(self.get_reason, axis=1)
+        reason = self.reason_template(filtered)
+        if reason is None:
+            filtered["reason"] = filtered.apply(self.get_reason, axis=1)
+        else:
+            template, columns = reason
+            filtered["reason"] = format_reasons(template, filtered, columns)
         return filtered
+
+
+class HeatChecker(BaseChecker):
+    # checkers of rules about whole heats rather than single swims, eg. everyone in the heat
+    # popped, which point at a wrong heat or file.  in_scope() picks the swims which count in
+    # a heat and matches() those breaking the rule; every swim in scope is flagged in heats
+    # with at least min_swimmers of them, all matching
+    row_local = False
+    columns = STATUS_COLUMNS + ["event_no"]
+
+    def __init__(self, min_swimmers=3, **kwargs):
+        super().__init__(**kwargs)
+        self.min_swimmers = min_swimmers
+
+    def in_scope(self, data, expressions):
+        return expressions.eligible
+
+    def matches(self, data, expressions):
+        raise NotImplementedError
+
+    def condition(self, data, expressions):
+        # swims outside the checker's filters do not count towards their heats
+        in_scope = self.in_scope(data, expressions)
+        if self.filters:
+            in_scope = in_scope & self.filters.mask(data)
+        matching = in_scope & self.matches(data, expressions)
+        counts = heat_counts(data["entry"], in_scope=in_scope, matching=matching)
+        return (
+            in_scope
+            & (counts.in_scope >= self.min_swimmers)
+            & (counts.matching == counts.in_scope)
+        )
+
+    def select(self, data, rows):
+        # all the flagged swims of a heat are selected together, so count them for reasons
+        return rows.assign(
+            heat_swimmers=rows.groupby(
+                ["event_no", "fin_heat"], observed=True
+            ).fin_lane.transform("size")
+        )
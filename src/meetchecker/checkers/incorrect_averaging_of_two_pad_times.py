@@ -1,35 +1,45 @@
 from .base import BaseChecker
+from ..engine import STATUS_COLUMNS
 
 from meetchecker.utils import approx_equals
 
 
 class Checker(BaseChecker):
+    columns = STATUS_COLUMNS + [
+        "num_pad_times",
+        "pad_time_spread",
+        "fin_time",
+        "min_pad_time",
+        "max_pad_time",
+    ]
+
     def __init__(self, threshold=1.0, **kwargs):
         super().__init__(**kwargs)
         self.threshold = threshold
         self.n = 2
 
-    def get_reason(self, row):
-        return "".join(
-            [
-                f"Incorrectly used average ({row.fin_time:.2f}) of 2 electronic times ",
-                f"({row.min_pad_time:.2f}, {row.max_pad_time:.2f}) that were far apart ",
-                f"({row.pad_time_spread:.2f} secs). Instead you should check time sheets and pick whichever ",
-                "electronic time looks better.",
-            ]
+    def reason_template(self, rows):
+        return (
+            "".join(
+                [
+                    "Incorrectly used average ({fin_time:.2f}) of 2 electronic times ",
+                    "({min_pad_time:.2f}, {max_pad_time:.2f}) that were far apart ",
+                    "({pad_time_spread:.2f} secs). Instead you should check time sheets and pick whichever ",
+                    "electronic time looks better.",
+                ]
+            ),
+            {},
         )
 
-    def check(self, data):
+    def condition(self, data, expressions):
         entry = data["entry"]
-        return entry[
-            (entry.fin_stat != "R")
-            & (entry.fin_stat != "Q")
-            & (entry.fin_heat != 0)
-            & (entry.num_pad_times == 2)
+        return (
+            expressions.eligible
+            & expressions.two_pad_times
             & (entry.pad_time_spread > self.threshold)
             & (
                 approx_equals(
                     entry.fin_time, (entry["max_pad_time"] + entry["min_pad_time"]) / 2
                 )
             )
-        ]
+        )
@@ -2,10 +2,10 @@ from .base import BaseChecker
 
 
 class Checker(BaseChecker):
-    def get_reason(self, row):
-        return "Its a relay"
+    columns = ["ind_rel"]
 
-    def check(self, data):
-        entry = data["entry"]
-        filtered = entry.loc[(entry.ind_rel == "R")]
-        return filtered
+    def reason_template(self, rows):
+        return "Its a relay", {}
+
+    def condition(self, data, expressions):
+        return data["entry"].ind_rel == "R"
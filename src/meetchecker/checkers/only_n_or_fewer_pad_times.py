@@ -2,17 +2,19 @@ from .base import BaseChecker
 
 
 class Checker(BaseChecker):
+    columns = ["fin_stat", "num_pad_times"]
+
     def __init__(self, n=1, **kwargs):
         super().__init__(**kwargs)
         self.n = n
 
-    def get_reason(self, row):
-        return f"Only got {row.num_pad_times} electronic times"
+    def reason_template(self, rows):
+        return "Only got {num_pad_times} electronic times", {}
 
-    def check(self, data):
+    def condition(self, data, expressions):
         entry = data["entry"]
-        return entry[
-            (entry.fin_stat != "R")
+        return (
+            expressions.not_status_r
             & (entry.num_pad_times <= self.n)
             & (entry.num_pad_times > 0)
-        ]
+        )
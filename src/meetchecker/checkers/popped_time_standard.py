@@ -1,56 +1,49 @@
 from .base import BaseChecker
+from ..engine import STATUS_COLUMNS
 from ..utils import emphasis as _
 
 
 class Checker(BaseChecker):
+    columns = STATUS_COLUMNS + ["popped_by", "fin_time", "actualseed_time"]
+
     def __init__(self, time_standard, **kwargs):
         super().__init__(**kwargs)
         self.time_standard = time_standard
 
-    def get_reason(self, row):
-        broke_standard_by = row.tag_time - row.fin_time
-        broke_standard_by_pct = 100 * broke_standard_by / row.tag_time
+    def reason_template(self, rows):
+        broke_standard_by = rows.tag_time - rows.fin_time
         return "".join(
             [
-                f"Time of {row.fin_time:.2f} popped by {row.popped_by:.2f} seconds and would break ",
-                _(f"{self.time_standard}"),
-                f" standard of {row.tag_time:.2f} by ",
-                _(f"{broke_standard_by:.2f} seconds / {broke_standard_by_pct:.1f}%"),
+                "Time of {fin_time:.2f} popped by {popped_by:.2f} seconds and would break ",
+                _("{time_standard}"),
+                " standard of {tag_time:.2f} by ",
+                _("{broke_standard_by:.2f} seconds / {broke_standard_by_pct:.1f}%"),
             ]
+        ), dict(
+            time_standard=self.time_standard,
+            broke_standard_by=broke_standard_by,
+            broke_standard_by_pct=100 * broke_standard_by / rows.tag_time,
         )
 
-    def check(self, data):
-        time_standards = data["time_standards"]
-        time_standards = time_standards[time_standards.tag_name == self.time_standard]
-        if len(time_standards) == 0:
+    def condition(self, data, expressions):
+        standard_times = data["standard_times"]
+        if self.time_standard not in standard_times:
             raise ValueError(f"No time standards found for {self.time_standard!r}")
+        tag_time = standard_times[self.time_standard]
         entry = data["entry"]
-        entry = entry.merge(
-            time_standards,
-            left_on=[
-                "event_gender",
-                "ind_rel",
-                "event_dist",
-                "event_stroke",
-                "low_age",
-                "high_age",
-            ],
-            right_on=[
-                "tag_gender",
-                "tag_indrel",
-                "tag_dist",
-                "tag_stroke",
-                "low_age",
-                "high_age",
-            ],
+        return (
+            expressions.eligible
+            & expressions.popped  # popped their time
+            & (entry.fin_time <= tag_time)  # reached the time standard
+            & (entry.actualseed_time > tag_time)  # had not previously reached it
         )
-        return entry.loc[
-            (entry.fin_stat != "R")
-            & (entry.fin_stat != "Q")
-            & (entry.fin_heat != 0)
-            & (entry.popped_by > 0)  # popped their time
-            & (entry.fin_time <= entry.tag_time)  # reached the time standard
-            & (
-                entry.actualseed_time > entry.tag_time
-            )  # had not previously reached the time standard
-        ]
+
+    def inputs(self, data):
+        times = data["standard_times"]
+        if self.time_standard not in times:
+            return super().inputs(data)
+        return super().inputs(data).assign(tag_time=times[self.time_standard])
+
+    def select(self, data, rows):
+        tag_time = data["standard_times"][self.time_standard]
+        return rows.assign(tag_time=tag_time.reindex(rows.index))
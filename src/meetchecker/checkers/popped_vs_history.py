@@ -0,0 +1,54 @@
+from .base import BaseChecker
+from ..history import HistoryStore
+from ..utils import emphasis as _
+
+
+class Checker(BaseChecker):
+    # like popped_by_percent_threshold, but against the athlete's best time for the event at
+    # previous meets in a history store (see history.py) rather than the meet's seed time
+    # the history store can change between runs, so every swim is checked every time
+    row_local = False
+
+    def __init__(self, history, threshold=10, **kwargs):
+        super().__init__(**kwargs)
+        self.history = history
+        self.threshold = threshold
+        self.store = HistoryStore(history, read_only=True)
+        self._best_times = None
+
+    def inputs(self, data):
+        return None
+
+    def best_times(self, data):
+        # queried once per meet's entry, in condition, and reused by select for the reasons
+        entry = data["entry"]
+        if self._best_times is None or self._best_times[0] is not entry:
+            best_times = self.store.best_times(entry, exclude_meet=data.get("meet"))
+            self._best_times = (entry, best_times)
+        return self._best_times[1]
+
+    def reason_template(self, rows):
+        improved_by = rows.best_time - rows.fin_time
+        return "".join(
+            [
+                "Time of {fin_time:.2f} compared to previous best of {best_time:.2f} ",
+                "is an improvement of ",
+                _("{improved_by:.2f} seconds / {improved_by_pct:.1f}%"),
+            ]
+        ), dict(
+            improved_by=improved_by,
+            improved_by_pct=100 * improved_by / rows.best_time,
+        )
+
+    def condition(self, data, expressions):
+        entry = data["entry"]
+        best_time = self.best_times(data)
+        improved_by_pct = 100 * (best_time - entry.fin_time) / best_time
+        return (
+            expressions.eligible
+            & (entry.fin_time > 0)
+            & (improved_by_pct >= self.threshold).fillna(False)
+        )
+
+    def select(self, data, rows):
+        return rows.assign(best_time=self.best_times(data).reindex(rows.index))
@@ -1,53 +1,45 @@
 from .base import BaseChecker
+from ..engine import STATUS_COLUMNS
 from ..utils import emphasis as _
 
 
 class Checker(BaseChecker):
+    columns = STATUS_COLUMNS + ["fin_time"]
+
     def __init__(self, record_name, **kwargs):
         super().__init__(**kwargs)
         self.record_name = record_name
 
-    def get_reason(self, row):
-        broke_record_by = row.record_time - row.fin_time
-        broke_record_by_pct = 100 * broke_record_by / row.record_time
+    def reason_template(self, rows):
+        broke_record_by = rows.record_time - rows.fin_time
         return "".join(
             [
-                f"Time of {row.fin_time:.2f} would break ",
-                _(f"{self.record_name}"),
-                f" record  of {row.record_time:.2f} by ",
-                _(f"{broke_record_by:.2f} seconds / {broke_record_by_pct:.1f}%"),
+                "Time of {fin_time:.2f} would break ",
+                _("{record_name}"),
+                " record  of {record_time:.2f} by ",
+                _("{broke_record_by:.2f} seconds / {broke_record_by_pct:.1f}%"),
             ]
+        ), dict(
+            record_name=self.record_name,
+            broke_record_by=broke_record_by,
+            broke_record_by_pct=100 * broke_record_by / rows.record_time,
         )
 
-    def check(self, data):
-        records = data["records"]
-        records = records[records.tag_name == self.record_name]
-        if len(records) == 0:
+    def condition(self, data, expressions):
+        record_times = data["record_times"]
+        if self.record_name not in record_times:
             raise ValueError(
                 f"No timing data found for record with name {self.record_name!r}"
             )
         entry = data["entry"]
-        entry = entry.merge(
-            records,
-            left_on=[
-                "event_gender",
-                "ind_rel",
-                "event_dist",
-                "event_stroke",
-                "low_age",
-                "high_age",
-            ],
-            right_on=[
-                "tag_gender",
-                "tag_indrel",
-                "tag_dist",
-                "tag_stroke",
-                "low_age",
-                "high_age",
-            ],
-        )
-        return entry.loc[
-            (entry.fin_stat != "R")
-            & (entry.fin_heat != 0)
-            & (entry.fin_time <= entry.record_time)
-        ]
+        return expressions.swum & (entry.fin_time <= record_times[self.record_name])
+
+    def inputs(self, data):
+        times = data["record_times"]
+        if self.record_name not in times:
+            return super().inputs(data)
+        return super().inputs(data).assign(record_time=times[self.record_name])
+
+    def select(self, data, rows):
+        record_time = data["record_times"][self.record_name]
+        return rows.assign(record_time=record_time.reindex(rows.index))
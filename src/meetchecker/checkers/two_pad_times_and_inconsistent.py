@@ -1,27 +1,27 @@
 from .base import BaseChecker
+from ..engine import STATUS_COLUMNS
 from ..utils import emphasis as _
 
 
 class Checker(BaseChecker):
+    columns = STATUS_COLUMNS + ["num_pad_times", "pad_time_spread"]
+
     def __init__(self, threshold=0.3, **kwargs):
         super().__init__(**kwargs)
         self.threshold = threshold
 
-    def get_reason(self, row):
+    def reason_template(self, rows):
         return "".join(
             [
                 "Only got 2 electronic times and they were ",
-                _(f"{row.pad_time_spread:.2f} seconds"),
-                f" apart (which is more than our threshold of {self.threshold:.2f} seconds)",
+                _("{pad_time_spread:.2f} seconds"),
+                " apart (which is more than our threshold of {threshold:.2f} seconds)",
             ]
-        )
+        ), dict(threshold=self.threshold)
 
-    def check(self, data):
-        entry = data["entry"]
-        return entry[
-            (entry.fin_stat != "R")
-            & (entry.fin_stat != "Q")
-            & (entry.fin_heat != 0)
-            & (entry.num_pad_times == 2)
-            & (entry.pad_time_spread > self.threshold)
-        ]
+    def condition(self, data, expressions):
+        return (
+            expressions.eligible
+            & expressions.two_pad_times
+            & (data["entry"].pad_time_spread > self.threshold)
+        )
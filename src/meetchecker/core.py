@@ -1,76 +1,26 @@
-from collections import defaultdict, namedtuple
-import importlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import itertools
 import logging
 from operator import attrgetter
 import pathlib
+import time
 
+import pandas as pd
+
+from meetchecker import datasourcing
 from meetchecker.datasourcing import get_data
-from meetchecker.check import CheckRecord
-from meetchecker.checkers.base import BaseChecker
-from meetchecker.report import create_html_report
-from meetchecker.color_wheel import ColorWheel
+from meetchecker.check import SWIM_COLUMNS, CheckResults
+from meetchecker.engine import flag_matrix
+from meetchecker.profiling import Profiler, stage, write_json
+from meetchecker.registry import CheckerRegistry
+from meetchecker.report import create_html_reports, event_fragment_cache
+from meetchecker.utils import LRUCache, frame_digest
 
 logger = logging.getLogger(__name__)
 
 
-NameReasonColor = namedtuple("NameReason", "name reason color")
-
-
-class LaneResult:
-    def __init__(self):
-        self._result = None
-        self.name_reasons = []
-
-    def accumulate(self, check_result):
-        if self._result is None:
-            self._result = check_result
-        self.name_reasons.append(
-            NameReasonColor(
-                check_result.check_name, check_result.reason, check_result.color
-            )
-        )
-
-    def num_exceptions(self):
-        return len(self.name_reasons)
-
-    def checks_as_str(self):
-        return "\n".join([f"    * {nr.name}: {nr.reason}" for nr in self.name_reasons])
-
-    def __getattr__(self, attr):
-        return getattr(self._result, attr)
-
-
-def accumulate_checks_by_lane(check_results):
-    accumulated = defaultdict(LaneResult)
-    key_fn = attrgetter("event_no", "fin_heat", "fin_lane")
-    for result in check_results:
-        key = key_fn(result)
-        accumulated[key].accumulate(result)
-    return accumulated
-
-
-def sort_results_normal(record):
-    return (record.event_no, record.fin_heat, record.fin_lane)
-
-
-def sort_results_reversed(record):
-    return (-record.event_no, record.fin_heat, record.fin_lane)
-
-
-def get_checker(name, config):
-    checker_module = config["checker"]
-    try:
-        module = importlib.import_module(checker_module)
-        params = config.get("params") or {}
-        cls = getattr(module, "Checker")
-        if issubclass(cls, BaseChecker):
-            return cls(name=name, **params)
-        logger.error(f"{cls} is not a subclass of BaseChecker")
-    except (ModuleNotFoundError,):
-        logger.error(f"Module {checker_module!r} not found for check name {name!r}")
-    except (AttributeError,):
-        logger.error(f"No Checker class defined in module {checker_module!r}")
+CheckTiming = namedtuple("CheckTiming", "name seconds rows")
 
 
 def console_output(lane_results):
@@ -91,49 +41,256 @@ def console_output(lane_results):
                 print(lane_result.checks_as_str())
 
 
-def run_checks(data, checks):
+def result_key(checker, data, fused=True):
+    # a checker's results depend only on its module, its settings (name, color, params) and
+    # its inputs, so they can be reused while none of those change.  None if they cannot be
+    # (see BaseChecker.inputs).  The results of unfused checkers are kept whole, so for them
+    # the key covers the shown columns too
+    inputs = checker.inputs(data)
+    if inputs is None:
+        return None
+    if not fused:
+        inputs = pd.concat(
+            [data["entry"].reindex(columns=SWIM_COLUMNS), inputs], axis=1
+        )
+    checker_cls = type(checker)
+    settings = repr(sorted(vars(checker).items()))
+    return (
+        checker_cls.__module__,
+        checker_cls.__qualname__,
+        settings,
+        frame_digest(inputs),
+    )
+
+
+# a cached check: its flags over data["entry"] (for fused checkers), a digest of the shown
+# columns of the rows it flagged and its results, which are reused as they are only while
+# those rows are shown the same
+CachedCheck = namedtuple("CachedCheck", "flags shown results")
+
+check_result_cache = LRUCache(max_entries=128)
+
+
+def shown_digest(rows):
+    return frame_digest(rows.reindex(columns=SWIM_COLUMNS))
+
+
+def run_checks(
+    data,
+    checks,
+    fused=True,
+    workers=None,
+    timings=None,
+    cache=None,
+    incremental=None,
+):
+    # checks is a CheckerRegistry, or a checks config to build one from.
+    # workers > 1 runs the checkers on a thread pool; if a timings list is passed, a
+    # CheckTiming is appended to it for every checker run.  A cache (eg. check_result_cache)
+    # reuses the flags and results of checkers whose inputs are unchanged since a past run,
+    # without evaluating their conditions again.
+    # Passing the same IncrementalState to successive runs re-checks only the rows which
+    # changed in between for row-local checkers
     results = []
-    color_wheel = ColorWheel.from_checks(checks)
-    for name, check_config in checks.items():
-        if not check_config.get("run", True):
-            logger.info(f"{name!r} is set not to run, skipping it")
-            continue
+    registry = CheckerRegistry.of(checks)
+    checkers = registry.checkers
 
-        checker = get_checker(name, check_config)
-        if checker.color is None:
-            checker.color = next(color_wheel)
-        if not checker:
-            continue
+    condition_seconds = {}
+    fused_inputs = {}
+    keys = {}
+    cached = {}
+
+    def look_up(name, checker, check_data, fused=True):
+        if cache is None:
+            return
         try:
-            these_results = checker.run(data)
-            if these_results is None:
-                logger.info(f"Check: {name}, no results!")
-                continue
-            adapted = CheckRecord.from_records(
-                these_results.to_dict(orient="records"), color=checker.color
+            keys[name] = result_key(checker, check_data, fused=fused)
+        except (KeyError, ValueError) as ex:
+            logger.debug(f"Check: {name}, not caching results ({ex})")
+            return
+        hit = cache.get(keys[name]) if keys[name] else None
+        if hit is not None:
+            cached[name] = hit
+
+    if fused:
+        groups = [(data, [item for item in checkers if item[1].has_condition()])]
+        if incremental is not None:
+            # row-local checks only need to look at the rows which changed
+            check_data = incremental.start(data, registry.checks)
+            groups = [
+                (check_data, [item for item in groups[0][1] if item[1].row_local]),
+                (data, [item for item in groups[0][1] if not item[1].row_local]),
+            ]
+        for group_data, group in groups:
+            for name, checker in group:
+                look_up(name, checker, group_data)
+            # the conditions of checkers with cached results need not be evaluated again
+            flags = flag_matrix(
+                group_data,
+                [item for item in group if item[0] not in cached],
+                timings=condition_seconds,
             )
-            logger.info(f"Check: {name}, {len(adapted)} results")
-            results.extend(adapted)
+            for name, _ in group:
+                if name in cached:
+                    flags[name] = cached[name].flags
+            # take the rows flagged by any check once, then each check's rows from those
+            flagged = group_data["entry"].loc[flags.any(axis=1)]
+            for name, _ in group:
+                fused_inputs[name] = (group_data, flagged, flags)
+
+    def check_records(name, checker):
+        # returns the check results (or None if there were none) and whether the check failed
+        try:
+            if name in fused_inputs:
+                check_data, flagged, flags = fused_inputs[name]
+                if name not in flags:
+                    return None, True
+                rows = flagged.loc[flags.loc[flagged.index, name]]
+                shown = shown_digest(rows)
+                hit = cached.get(name)
+                if hit is not None and hit.shown == shown:
+                    logger.debug(f"Check: {name}, reusing cached results")
+                    return hit.results, False
+                selected = checker.select(check_data, rows)
+                these_results = checker.add_reasons(selected.copy())
+                entry = (flags[name].to_numpy(), shown)
+            else:
+                look_up(name, checker, data, fused=False)
+                if name in cached:
+                    logger.debug(f"Check: {name}, reusing cached results")
+                    return cached[name].results, False
+                these_results = checker.run(data)
+                entry = (None, None)
+            adapted = None
+            if these_results is not None:
+                adapted = CheckResults.from_checked(these_results, color=checker.color)
+            if keys.get(name):
+                cache.put(keys[name], CachedCheck(*entry, adapted))
+            return adapted, False
         except (ValueError,) as ex:
             logger.error(f"Failed to run checker {name} with exception: {ex}")
-    return results
-
-
-def run(mdb_file, output_file, checks, console_output=False):
-    data = get_data(mdb_file)
-
-    check_results = run_checks(data, checks)
-
-    lane_results = list(accumulate_checks_by_lane(check_results).values())
+            return None, True
+
+    def run_checker(name, checker):
+        adapted, failed = check_records(name, checker)
+        if incremental is None or name not in fused_inputs or not checker.row_local:
+            return adapted, failed
+        if failed:
+            incremental.failed(name)
+            return adapted, failed
+        return incremental.merge(name, adapted) or None, failed
+
+    def timed(item):
+        start = time.perf_counter()
+        adapted, failed = run_checker(*item)
+        elapsed = time.perf_counter() - start + condition_seconds.get(item[0], 0)
+        return adapted, failed, elapsed
+
+    if workers and workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(timed, checkers))
+    else:
+        outcomes = [timed(item) for item in checkers]
+
+    if incremental is not None and fused:
+        incremental.finish()
+
+    # merge in the order the checks are configured, however they were run
+    for (name, checker), (adapted, failed, elapsed) in zip(checkers, outcomes):
+        if timings is not None:
+            timings.append(CheckTiming(name, elapsed, len(adapted or [])))
+        if failed:
+            continue
+        if adapted is None:
+            logger.info(f"Check: {name}, no results! ({elapsed:.3f}s)")
+            continue
+        logger.info(f"Check: {name}, {len(adapted)} results ({elapsed:.3f}s)")
+        results.append(adapted)
+    return CheckResults.concat(results)
+
+
+def reversed_report_path(output):
+    return output.parent / f"{output.stem}_rev{output.suffix}"
+
+
+def write_reports(
+    check_results, meetfile, output, profiler=None, cache=event_fragment_cache
+):
+    # writes the report to output, and the same in event-reversed order so that auto refresh
+    # puts the latest results on top.  Returns the lane results (in event order)
+    output = pathlib.Path(output)
+    with stage(profiler, "by_event") as timed:
+        events = check_results.by_event()
+        timed.rows = len(events)
+    with stage(profiler, "create_html_reports") as timed:
+        create_html_reports(
+            events,
+            meetfile=meetfile,
+            output=output,
+            reversed_output=reversed_report_path(output),
+            cache=cache,
+        )
+        timed.rows = len(events)
+    return [lane_result for _, event_records in events for lane_result in event_records]
+
+
+def run(
+    mdb_file,
+    output_file,
+    checks,
+    console_output=False,
+    dump_dir=None,
+    table_cache=True,
+    reader="mdb-export",
+    export_workers=None,
+    check_workers=None,
+    result_cache=True,
+    incremental=None,
+    profile=None,
+    profile_log=None,
+    filters=None,
+):
+    # profile is a path to write a JSON report of the time spent in each stage of the run to,
+    # and profile_log an optional profiling.ProfileLog to add the report to.  filters (a
+    # filters.Filters) restricts the whole run to some teams / events / sessions
+    profiler = Profiler() if profile is not None else None
+    registry = CheckerRegistry.of(checks)
+    data = get_data(
+        mdb_file,
+        max_workers=export_workers,
+        cache=datasourcing.table_cache if table_cache else None,
+        dump_dir=dump_dir,
+        reader=reader,
+        profiler=profiler,
+        filters=filters,
+        checks=registry,
+    )
+
+    with stage(profiler, "run_checks") as timed:
+        check_results = run_checks(
+            data,
+            registry,
+            workers=check_workers,
+            timings=profiler.checks if profiler else None,
+            cache=check_result_cache if result_cache else None,
+            incremental=incremental,
+        )
+        timed.rows = len(check_results)
 
-    lane_results.sort(key=sort_results_normal)
-    output = pathlib.Path(output_file)
-    create_html_report(lane_results, meetfile=mdb_file, output=output)
+    lane_results = write_reports(
+        check_results,
+        mdb_file,
+        output_file,
+        profiler=profiler,
+        cache=event_fragment_cache if result_cache else None,
+    )
 
     if console_output:
         console_output(lane_results)
 
-    # also output results in event-reversed order so that auto refresh puts latest results on top
-    lane_results.sort(key=sort_results_reversed)
-    reversed_output = output.parent / f"{output.stem}_rev{output.suffix}"
-    create_html_report(lane_results, meetfile=mdb_file, output=reversed_output)
+    if profiler is not None:
+        report = profiler.report()
+        write_json(report, pathlib.Path(profile))
+        logger.info(f"Wrote profile to {profile} ({report['seconds']:.3f}s in total)")
+        if profile_log is not None:
+            profile_log.add(report)
@@ -7,7 +7,10 @@ from rich import console
 import webbrowser
 
 
+from meetchecker.changes import ChangeDetector
 from meetchecker.core import run
+from meetchecker.incremental import IncrementalState
+from meetchecker.profiling import ProfileLog
 
 stopping = False
 
@@ -22,12 +25,34 @@ def add_input(input_queue):
 
 
 class Daemon:
-    def __init__(self, database, output, checks, interval):
+    def __init__(
+        self,
+        database,
+        output,
+        checks,
+        interval,
+        content_hash=False,
+        incremental=False,
+        profile_runs=0,
+        **run_options,
+    ):
         self.database = database
         self.output = output
         self.checks = checks
         self.interval = interval
+        self.run_options = run_options
+        if incremental:
+            # carried across refreshes so each one only re-checks what changed
+            self.run_options["incremental"] = IncrementalState()
+        profile = run_options.get("profile")
+        if profile is not None and profile_runs:
+            # a rolling log of the timings of the last profile_runs refreshes
+            log_path = profile.with_name(f"{profile.stem}_log.json")
+            self.run_options["profile_log"] = ProfileLog(
+                log_path, max_runs=profile_runs
+            )
         self.console = console.Console()
+        self.change_detector = ChangeDetector(database, use_hash=content_hash)
 
     def run(self):
         self.input_queue = queue.Queue()
@@ -36,10 +61,12 @@ class Daemon:
         input_thread.start()
         start = time.time()
         elapsed = 0
+        self.change_detector.check()
         run(
             self.database,
             self.output,
             self.checks,
+            **self.run_options,
         )
         with self.console.status("Meet Checker", spinner="aesthetic") as status:
             while True:
@@ -51,12 +78,17 @@ class Daemon:
 
                 elapsed = time.time() - start
                 if elapsed > self.interval or input == "r":
-                    self.console.log("[blue]Refreshing...[/blue]")
-                    run(
-                        self.database,
-                        self.output,
-                        self.checks,
-                    )
+                    # a manual refresh always re-runs, a timed one only if the database changed
+                    if self.change_detector.check() or input == "r":
+                        self.console.log("[blue]Refreshing...[/blue]")
+                        run(
+                            self.database,
+                            self.output,
+                            self.checks,
+                            **self.run_options,
+                        )
+                    else:
+                        self.console.log("No changes to database, keeping reports")
                     start = time.time()
                     elapsed = 0
                 else:
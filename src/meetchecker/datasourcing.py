@@ -1,12 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import io
+import logging
 import math
 import pandas as pd
 import pathlib
 import subprocess
-import tempfile
+import threading
+import time
 
 import numpy as np
 
+from meetchecker.mdbreader import MdbFile, MdbReaderError
+from meetchecker.profiling import stage
+from meetchecker.utils import LRUCache
+
+logger = logging.getLogger(__name__)
+
+PAD_TIME_COLUMNS = ["fin_back1", "fin_back2", "fin_back3"]
+
+# low-cardinality text columns of the merged entry frame, stored as categoricals
+CATEGORICAL_COLUMNS = [
+    "fin_stat",
+    "event_stroke",
+    "event_sex",
+    "event_gender",
+    "ind_rel",
+    "team_abbr",
+    "team_name",
+    "event_name",
+]
+
+# integer columns of the merged entry frame, downcast to the smallest type that holds them.
+# times stay float64, so comparisons against seed / standard / record times are unchanged
+INTEGER_COLUMNS = [
+    "event_no",
+    "event_ptr",
+    "fin_heat",
+    "fin_lane",
+    "fin_heatplace",
+    "low_age",
+    "high_age",
+    "num_pad_times",
+]
+
+# text columns whose padding is stripped when loading
+STRIPPED_COLUMNS = ["Last_name", "First_name", "Pref_name", "Team_name", "Team_abbr"]
+
+SNAPSHOT_SUFFIX = ".parquet"
+
+# ways of getting the tables out of the .mdb file: the mdb-export tool, or our in-process reader
+READERS = ("mdb-export", "python")
+
+# the keys on which time standards / records match events
+EVENT_TAG_KEYS = [
+    "event_gender",
+    "ind_rel",
+    "event_dist",
+    "event_stroke",
+    "low_age",
+    "high_age",
+]
+# processed frames whose rows line up with (and share an index with) the entry frame
+ENTRY_ALIGNED = ["standard_times", "record_times"]
+
+TAG_KEYS = ["tag_gender", "tag_indrel", "tag_dist", "tag_stroke", "low_age", "high_age"]
+
 STROKE = dict(
     A="Free",
     B="Back",
@@ -95,6 +154,7 @@ COLUMNS = dict(
         "Fin_lane",
         "Fin_stat",
         "Fin_Time",
+        "Fin_course",
         "Fin_heatplace",
         "Fin_back1",
         "Fin_back2",
@@ -105,39 +165,294 @@ COLUMNS = dict(
 )
 
 
-def get_data(mdb_filepath):
-    tables = extract_tables_from_mdb(mdb_filepath)
-    dump_tables(tables, pathlib.Path(tempfile.gettempdir()), overwrite=True)
-    dataframes = tables_to_dataframes(tables)
-    return post_process_dataframes(dataframes)
+# the tables of the meet's sessions, only read when filtering by session
+SESSION_COLUMNS = dict(
+    session=["Sess_ptr", "Sess_no"],
+    sessitem=["Sess_ptr", "Event_ptr"],
+)
+
+
+class TableCache(LRUCache):
+    # parsed dataframes keyed on (table name, digest of the exported csv text), so that tables
+    # which have not changed since the last refresh are not parsed again.  Cached dataframes
+    # are shared, so callers must not modify them in place.
+    def __init__(self, max_entries=2 * len(COLUMNS)):
+        super().__init__(max_entries)
+
+    def get(self, table_name, digest):
+        return super().get((table_name, digest))
+
+    def put(self, table_name, digest, df):
+        super().put((table_name, digest), df)
+
+
+table_cache = TableCache()
+
+
+def get_data(
+    mdb_filepath,
+    max_workers=None,
+    cache=table_cache,
+    dump_dir=None,
+    reader="mdb-export",
+    profiler=None,
+    filters=None,
+    checks=None,
+):
+    # profiler (a profiling.Profiler) times each stage of reading and processing the tables.
+    # filters (a filters.Filters) drops the rows of unwanted swims as soon as they are read.
+    # checks (a registry.CheckerRegistry) are the checks to be run on the data, so that all
+    # they need is read, eg. the events of each session if any of them filter by session
+    meet = str(pathlib.Path(mdb_filepath).resolve())
+    session_events = None
+    needs_sessions = checks is not None and checks.needs_sessions
+    if needs_sessions or (filters and filters.sessions is not None):
+        session_events = read_session_events(mdb_filepath, reader=reader)
+    if reader == "python":
+        try:
+            with stage(profiler, "read_tables") as timed:
+                dataframes = read_tables_from_mdb(mdb_filepath)
+                timed.rows = table_rows(dataframes)
+            return post_process_dataframes(
+                dataframes,
+                profiler=profiler,
+                meet=meet,
+                filters=filters,
+                session_events=session_events,
+            )
+        except MdbReaderError as ex:
+            logger.warning(
+                f"Unable to read {mdb_filepath} in-process ({ex}), using mdb-export"
+            )
+    if cache is None and dump_dir is None:
+        # nothing needs the raw table text, so parse it as it streams out of mdb-export.  This
+        # is the only streaming path: the table cache is keyed on a digest of each table's
+        # text, which must be read whole to tell whether the table changed and its parse can
+        # be skipped, so --no-table-cache is how to get streaming (batchmeet always streams)
+        with stage(profiler, "stream_tables") as timed:
+            dataframes = stream_tables_from_mdb(mdb_filepath, max_workers=max_workers)
+            timed.rows = table_rows(dataframes)
+    else:
+        with stage(profiler, "extract_tables_from_mdb"):
+            tables = extract_tables_from_mdb(mdb_filepath, max_workers=max_workers)
+        if dump_dir is not None:
+            dump_tables_in_background(tables, pathlib.Path(dump_dir))
+        with stage(profiler, "tables_to_dataframes") as timed:
+            dataframes = tables_to_dataframes(tables, cache=cache)
+            timed.rows = table_rows(dataframes)
+    return post_process_dataframes(
+        dataframes,
+        profiler=profiler,
+        meet=meet,
+        filters=filters,
+        session_events=session_events,
+    )
+
+
+def read_session_events(mdb_filepath, reader="mdb-export"):
+    # the events in each of the meet's sessions, as event_ptr and sess_no
+    tables = {}
+    for table_name, columns in SESSION_COLUMNS.items():
+        if reader == "python":
+            try:
+                with MdbFile(mdb_filepath) as mdb:
+                    tables[table_name] = mdb.read_table(table_name, columns)
+                continue
+            except MdbReaderError as ex:
+                logger.warning(
+                    f"Unable to read {table_name} in-process ({ex}), using mdb-export"
+                )
+        tables[table_name] = pd.read_csv(
+            io.StringIO(export_table(mdb_filepath, table_name)), usecols=columns
+        )
+    session, sessitem = (
+        tables[name].rename(str.lower, axis="columns") for name in SESSION_COLUMNS
+    )
+    return sessitem.merge(session, on="sess_ptr")[["event_ptr", "sess_no"]]
+
+
+def table_rows(dataframes):
+    return sum(len(df.index) for df in dataframes.values())
 
 
 def get_data_from_csvs(path):
     tables = load_tables_from_csvs(path)
     dataframes = tables_to_dataframes(tables)
-    return post_process_dataframes(dataframes)
-
-
-def post_process_dataframes(dataframes):
-    data = merge_tables(dataframes)
-    entry = entry_calculated_fields(data["entry"])
-    try:
-        relay = relay_calculated_fields(data["relay"])
-        # concat entry and relay
-        data["entry"] = pd.concat([entry, relay], axis=0)
-        del data["relay"]
-    except ValueError:
-        # if no relays, e.g. for time trials
-        pass
+    return post_process_dataframes(dataframes, meet=str(path.resolve()))
+
+
+def get_data_from_snapshot(path):
+    return post_process_dataframes(load_snapshot(path), meet=str(path.resolve()))
+
+
+def get_data_from_dump(path):
+    # a directory written by dumpmeet, in either format
+    if (path / f"entry{SNAPSHOT_SUFFIX}").exists():
+        return get_data_from_snapshot(path)
+    return get_data_from_csvs(path)
+
+
+def post_process_dataframes(
+    dataframes, profiler=None, meet=None, filters=None, session_events=None
+):
+    # meet names the meet the tables came from, if known: the resolved path of its database
+    # (or dump), as meets in different directories can have files of the same name.
+    # filters are applied before anything is merged or calculated
+    if filters:
+        with stage(profiler, "filter_tables") as timed:
+            dataframes = filters.filter_tables(dataframes, session_events)
+            timed.rows = table_rows(dataframes)
+    with stage(profiler, "merge_tables") as timed:
+        data = merge_tables(dataframes)
+        timed.rows = len(data["entry"].index)
+    with stage(profiler, "calculated_fields") as timed:
+        entry = entry_calculated_fields(data["entry"])
+        try:
+            relay = relay_calculated_fields(data["relay"])
+            # concat entry and relay
+            data["entry"] = pd.concat([entry, relay], axis=0, ignore_index=True)
+            del data["relay"]
+        except ValueError:
+            # if no relays, e.g. for time trials
+            pass
+        timed.rows = len(data["entry"].index)
+    with stage(profiler, "tag_times_by_swim"):
+        data["standard_times"] = tag_times_by_swim(
+            data["entry"], data["time_standards"], "tag_time"
+        )
+        data["record_times"] = tag_times_by_swim(
+            data["entry"], data["records"], "record_time"
+        )
+    with stage(profiler, "normalize_dtypes"):
+        data["entry"] = normalize_dtypes(data["entry"])
+    data["meet"] = meet
+    if session_events is not None:
+        data["sessions"] = session_events
     return data
 
 
-def extract_tables_from_mdb(mdb_filepath):
-    data = {}
-    for table in COLUMNS.keys():
-        cmd = ["mdb-export", mdb_filepath, table]
-        data[table] = subprocess.check_output(cmd, encoding="utf-8")
-    return data
+def restrict_entries(data, mask):
+    # data with only the entry rows where mask is True, keeping the frames which are aligned
+    # with the entry frame in step
+    restricted = dict(data)
+    for name in ["entry", *ENTRY_ALIGNED]:
+        if name in data:
+            restricted[name] = data[name].loc[mask]
+    return restricted
+
+
+def tag_times_by_swim(entry, tags, time_column):
+    # joins every time standard (or record) onto the swims once, in a wide frame aligned with
+    # entry: one column per tag_name, holding that tag's time for the swim's event, or nan.
+    # if a tag has more than one time for the same event, the first is used
+    tag_names = list(tags["tag_name"].unique())
+    wide = (
+        tags.drop_duplicates(TAG_KEYS + ["tag_name"])
+        .pivot(index=TAG_KEYS, columns="tag_name", values=time_column)
+        .reset_index()
+    )
+    joined = entry[EVENT_TAG_KEYS].merge(
+        wide, how="left", left_on=EVENT_TAG_KEYS, right_on=TAG_KEYS
+    )
+    return joined[tag_names].set_axis(entry.index, axis="index")
+
+
+def normalize_dtypes(dataframe):
+    before = dataframe.memory_usage(deep=True).sum()
+    for column in CATEGORICAL_COLUMNS:
+        if column in dataframe:
+            dataframe[column] = dataframe[column].astype("category")
+    for column in INTEGER_COLUMNS:
+        if column in dataframe:
+            dataframe[column] = pd.to_numeric(dataframe[column], downcast="integer")
+    after = dataframe.memory_usage(deep=True).sum()
+    logger.info(
+        f"Normalized dtypes of {len(dataframe.index)} rows, "
+        f"memory {before / 1024:.0f}KiB -> {after / 1024:.0f}KiB"
+    )
+    return dataframe
+
+
+def export_table(mdb_filepath, table):
+    cmd = ["mdb-export", mdb_filepath, table]
+    return subprocess.check_output(cmd, encoding="utf-8")
+
+
+def stream_table(mdb_filepath, table):
+    # feed mdb-export's stdout straight into the csv parser, without holding the table text
+    cmd = ["mdb-export", mdb_filepath, table]
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, encoding="utf-8") as proc:
+        try:
+            df = read_table_csv(proc.stdout, table)
+        except ValueError:
+            # no output, or output cut short (pandas' EmptyDataError, ParserError, or missing
+            # columns), most likely because mdb-export failed part way
+            proc.stdout.read()
+            if proc.wait():
+                raise subprocess.CalledProcessError(proc.returncode, cmd)
+            raise
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+    return df
+
+
+def map_tables(fn, mdb_filepath, max_workers=None):
+    # runs fn(mdb_filepath, table) for every table in COLUMNS, up to max_workers at once
+    # (one per table by default, max_workers=1 runs them sequentially), logging how long each took
+    tables = list(COLUMNS.keys())
+    max_workers = max_workers or len(tables)
+
+    def timed(table):
+        start = time.perf_counter()
+        result = fn(mdb_filepath, table)
+        elapsed = time.perf_counter() - start
+        logger.debug(f"Exported table {table!r} in {elapsed:.3f}s")
+        return result, elapsed
+
+    start = time.perf_counter()
+    if max_workers == 1:
+        exported = [timed(table) for table in tables]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            exported = list(executor.map(timed, tables))
+    timings = ", ".join(
+        f"{table}={elapsed:.2f}s" for table, (_, elapsed) in zip(tables, exported)
+    )
+    logger.info(
+        f"Exported {len(tables)} tables in {time.perf_counter() - start:.2f}s "
+        f"with {max_workers} worker(s): {timings}"
+    )
+    return {table: result for table, (result, _) in zip(tables, exported)}
+
+
+def extract_tables_from_mdb(mdb_filepath, max_workers=None):
+    return map_tables(export_table, mdb_filepath, max_workers=max_workers)
+
+
+def stream_tables_from_mdb(mdb_filepath, max_workers=None):
+    return map_tables(stream_table, mdb_filepath, max_workers=max_workers)
+
+
+def read_tables_from_mdb(mdb_filepath):
+    # in-process alternative to mdb-export, decoding just the COLUMNS of each table
+    start = time.perf_counter()
+    ret = {}
+    with MdbFile(mdb_filepath) as mdb:
+        for table_name in COLUMNS:
+            ret[table_name] = read_mdb_table(mdb, table_name)
+    logger.info(
+        f"Read {len(ret)} tables in-process in {time.perf_counter() - start:.2f}s"
+    )
+    return ret
+
+
+def read_mdb_table(mdb, table_name):
+    # one table from an open MdbFile, the same as read_table_csv gives from mdb-export
+    df = mdb.read_table(table_name, COLUMNS[table_name])
+    for column in STRIPPED_COLUMNS:
+        if column in df:
+            df[column] = df[column].fillna("").str.strip()
+    return df.rename(str.lower, axis="columns")
 
 
 def dump_tables(tables, output_path, overwrite=False):
@@ -153,24 +468,81 @@ def dump_tables(tables, output_path, overwrite=False):
             f.write(table_data)
 
 
-def tables_to_dataframes(tables):
+def dump_tables_in_background(tables, output_path):
+    # debug dump of the raw tables, written off the main thread so it never holds up the checks.
+    # Not a daemon thread, so that a one-off run waits for the dump to finish before exiting
+    # rather than leaving truncated files
+    def target():
+        try:
+            dump_tables(tables, output_path, overwrite=True)
+            logger.debug(f"Dumped {len(tables)} tables to {output_path}")
+        except OSError as ex:
+            logger.error(f"Failed to dump tables to {output_path}: {ex}")
+
+    thread = threading.Thread(target=target, name="dump-tables", daemon=False)
+    thread.start()
+    return thread
+
+
+def table_digest(table_data):
+    return hashlib.blake2b(table_data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def parse_table(table_name, table_data):
+    return read_table_csv(io.StringIO(table_data), table_name)
+
+
+def read_table_csv(f, table_name):
+    df = pd.read_csv(
+        f,
+        usecols=COLUMNS[table_name],
+        converters={column: str.strip for column in STRIPPED_COLUMNS},
+    )
+    return df.rename(str.lower, axis="columns")
+
+
+def tables_to_dataframes(tables, cache=None):
     ret = {}
     for table_name, table_data in tables.items():
-        df = pd.read_csv(
-            io.StringIO(table_data),
-            usecols=COLUMNS[table_name],
-            converters={
-                "Last_name": str.strip,
-                "First_name": str.strip,
-                "Pref_name": str.strip,
-                "Team_name": str.strip,
-                "Team_abbr": str.strip,
-            },
-        )
-        ret[table_name] = df.rename(str.lower, axis="columns")
+        if cache is None:
+            ret[table_name] = parse_table(table_name, table_data)
+            continue
+        digest = table_digest(table_data)
+        df = cache.get(table_name, digest)
+        if df is None:
+            df = parse_table(table_name, table_data)
+            cache.put(table_name, digest, df)
+        else:
+            logger.debug(
+                f"Reusing parsed table {table_name!r}, unchanged since last run"
+            )
+        ret[table_name] = df
     return ret
 
 
+def save_snapshot(dataframes, output_path, overwrite=False):
+    # columnar copy of the parsed, pre-merge tables which keeps their dtypes (needs pyarrow)
+    paths = {name: output_path / f"{name}{SNAPSHOT_SUFFIX}" for name in dataframes}
+    if any(path.exists() for path in paths.values()) and overwrite is False:
+        raise ValueError(
+            f"Cannot save snapshot to {output_path} as file(s) already exist and would be overwritten"
+        )
+    for name, df in dataframes.items():
+        df.to_parquet(paths[name], compression="zstd", index=False)
+
+
+def load_snapshot(path, columns=None):
+    # columns optionally maps a table name to the (lower case) columns to read from it,
+    # the rest are never loaded
+    columns = columns or {}
+    return {
+        table_name: pd.read_parquet(
+            path / f"{table_name}{SNAPSHOT_SUFFIX}", columns=columns.get(table_name)
+        )
+        for table_name in COLUMNS
+    }
+
+
 def load_tables_from_csvs(path):
     data = {}
     for table_name in COLUMNS:
@@ -180,56 +552,63 @@ def load_tables_from_csvs(path):
     return data
 
 
-def calc_num_pad_times(row):
-    values = [getattr(row, attr) for attr in ("fin_back1", "fin_back2", "fin_back3")]
-    return len([v for v in values if v and not math.isnan(v)])
-
-
-def calc_max_pad_time(row):
-    values = [getattr(row, attr) for attr in ("fin_back1", "fin_back2", "fin_back3")]
-    values = [v for v in values if v and not math.isnan(v)]
-    return max(values) if values else math.nan
-
-
-def calc_min_pad_time(row):
-    values = [getattr(row, attr) for attr in ("fin_back1", "fin_back2", "fin_back3")]
-    values = [v for v in values if v and not math.isnan(v)]
-    return min(values) if values else math.nan
+def pad_times(dataframe):
+    # fin_back1..3 as one (rows x 3) array, with 0 treated as a missing pad time
+    pads = dataframe[PAD_TIME_COLUMNS].to_numpy(dtype=float, copy=True)
+    pads[pads == 0] = np.nan
+    return pads
 
 
 def calc_event_name(row):
     gender = "Boys" if row.event_sex == "B" else "Girls"
     age = f"{row.high_age}&U" if row.low_age == 0 else f"{row.low_age}-{row.high_age}"
     distance = str(int(row.event_dist))
-    stroke = STROKE.get(row.event_stroke)
-    if row.ind_rel == "R":
-        if stroke == "IM":
-            stroke = "Medley Relay"
-        else:
-            stroke = f"{stroke} Relay"
+    stroke = row.relay_label if row.ind_rel == "R" else row.stroke_label
     return " ".join([gender, age, distance, stroke])
 
 
-def calc_popped_by(row):
-    if row.actualseed_time and row.fin_time:
-        return row.actualseed_time - row.fin_time
+def event_metadata(event):
+    # names for each event, built once per event and joined onto the swims,
+    # rather than recalculated for every entry / relay row
+    stroke_label = event["event_stroke"].map(STROKE)
+    relay_label = (stroke_label + " Relay").where(stroke_label != "IM", "Medley Relay")
+    event = event.assign(
+        stroke_label=stroke_label,
+        relay_label=relay_label.where(event["ind_rel"] == "R"),
+    )
+    event["event_name"] = (
+        event.apply(calc_event_name, axis=1)
+        if len(event.index)
+        else pd.Series(dtype=object)
+    )
+    return event
+
+
+def calc_popped_by(dataframe):
+    # only defined when both the seed and final times are set (ie. non-zero)
+    popped_by = dataframe["actualseed_time"] - dataframe["fin_time"]
+    return popped_by.where(
+        (dataframe["actualseed_time"] != 0) & (dataframe["fin_time"] != 0)
+    )
 
 
 def common_calculated_fields(dataframe):
-    dataframe["event_name"] = dataframe.apply(calc_event_name, axis=1)
-    dataframe["num_pad_times"] = dataframe.apply(calc_num_pad_times, axis=1)
-    dataframe["max_pad_time"] = dataframe.apply(calc_max_pad_time, axis=1)
-    dataframe["min_pad_time"] = dataframe.apply(calc_min_pad_time, axis=1)
+    pads = pad_times(dataframe)
+    dataframe["num_pad_times"] = (~np.isnan(pads)).sum(axis=1)
+    # fmin / fmax skip missing pad times, giving nan only when all of them are missing
+    dataframe["max_pad_time"] = np.fmax.reduce(pads, axis=1)
+    dataframe["min_pad_time"] = np.fmin.reduce(pads, axis=1)
     dataframe["pad_time_spread"] = dataframe["max_pad_time"] - dataframe["min_pad_time"]
-    dataframe["popped_by"] = dataframe.apply(calc_popped_by, axis=1)
+    dataframe["popped_by"] = calc_popped_by(dataframe)
     dataframe["actualseed_time"] = dataframe["actualseed_time"].replace(0, math.nan)
     return dataframe
 
 
 def relay_calculated_fields(dataframe):
     dataframe = common_calculated_fields(dataframe)
-    dataframe["athlete_name"] = dataframe[["team_name", "team_ltr"]].agg(
-        " - ".join, axis=1
+    # str.cat rather than a row-wise join, which also copes with no rows (eg. all filtered out)
+    dataframe["athlete_name"] = dataframe.team_name.str.cat(
+        dataframe.team_ltr, sep=" - "
     )
     return dataframe
 
@@ -238,8 +617,8 @@ def entry_calculated_fields(dataframe):
     dataframe = common_calculated_fields(dataframe)
     dataframe["pref_name"] = dataframe.pref_name.replace("", np.nan)
     dataframe["given_name"] = dataframe.pref_name.combine_first(dataframe.first_name)
-    dataframe["athlete_name"] = dataframe[["last_name", "given_name"]].agg(
-        ", ".join, axis=1
+    dataframe["athlete_name"] = dataframe.last_name.str.cat(
+        dataframe.given_name, sep=", "
     )
     return dataframe
 
@@ -254,11 +633,12 @@ def merge_tables(data):
     athlete = data["athlete"].merge(data["team"], left_on="team_no", right_on="team_no")
     entry = data["entry"].merge(athlete, left_on="ath_no", right_on="ath_no")
     relay = data["relay"].merge(data["team"], left_on="team_no", right_on="team_no")
-    event = data["event"]
+    event = event_metadata(data["event"])
     relay = relay.merge(event, left_on="event_ptr", right_on="event_ptr")
     entry = entry.merge(event, left_on="event_ptr", right_on="event_ptr")
     return dict(
         athlete=athlete,
+        events=event,
         entry=entry,
         relay=relay,
         time_standards=time_standards,
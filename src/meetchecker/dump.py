@@ -2,17 +2,20 @@ import argparse
 import logging
 import pathlib
 
-from datasourcing import extract_tables_from_mdb, dump_tables, get_data_from_csvs
+from meetchecker.datasourcing import (
+    extract_tables_from_mdb,
+    dump_tables,
+    save_snapshot,
+    tables_to_dataframes,
+)
 
 
-def dump(meet_file, output_dir, force=False):
-    tables = extract_tables_from_mdb(meet_file)
-    dump_tables(tables, output_dir, overwrite=force)
-
-
-def load(output_dir):
-    data = get_data_from_csvs(output_dir)
-    breakpoint()
+def dump(meet_file, output_dir, force=False, workers=None, format="csv"):
+    tables = extract_tables_from_mdb(meet_file, max_workers=workers)
+    if format == "parquet":
+        save_snapshot(tables_to_dataframes(tables), output_dir, overwrite=force)
+    else:
+        dump_tables(tables, output_dir, overwrite=force)
 
 
 def parse_args():
@@ -20,6 +23,18 @@ def parse_args():
     parser.add_argument("--meet", type=pathlib.Path, dest="meet_file", required=True)
     parser.add_argument("--output", type=pathlib.Path, required=True)
     parser.add_argument("--force", action="store_const", const=True, default=False)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Max number of tables to export at once (default: all of them)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="Raw csv text, or a typed, compressed parquet snapshot of each table",
+    )
     parser.add_argument(
         "-q",
         "--quiet",
@@ -50,7 +65,7 @@ def main():
 
     if not args.meet_file.exists():
         raise ValueError(f"Meet file at {args.meet_file} does not exist")
-    dump(args.meet_file, args.output, args.force)
+    dump(args.meet_file, args.output, args.force, args.workers, args.format)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+from functools import cached_property
+import logging
+import time
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# the columns of data["entry"] behind the eligible / swum / not_status_* expressions
+STATUS_COLUMNS = ["fin_stat", "fin_heat"]
+
+
+class Expressions:
+    # boolean masks (and other columns) over data["entry"] which several checkers share,
+    # each computed at most once per run however many checkers use it
+    def __init__(self, data):
+        self.data = data
+        self.entry = data["entry"]
+
+    @cached_property
+    def not_status_r(self):
+        return self.entry.fin_stat != "R"
+
+    @cached_property
+    def not_status_q(self):
+        return self.entry.fin_stat != "Q"
+
+    @cached_property
+    def in_a_heat(self):
+        return self.entry.fin_heat != 0
+
+    @cached_property
+    def swum(self):
+        return self.not_status_r & self.in_a_heat
+
+    @cached_property
+    def eligible(self):
+        return self.swum & self.not_status_q
+
+    @cached_property
+    def popped(self):
+        return self.entry.popped_by > 0
+
+    @cached_property
+    def disimproved(self):
+        return self.entry.popped_by < 0
+
+    @cached_property
+    def popped_percent(self):
+        return 100 * self.entry.popped_by / self.entry.actualseed_time
+
+    @cached_property
+    def two_pad_times(self):
+        return self.entry.num_pad_times == 2
+
+
+def heat_counts(entry, **masks):
+    # for each row of entry, the number of rows in its heat (event_no, fin_heat) for which
+    # each of the boolean masks is True, in one grouped aggregation over all heats
+    counts = pd.DataFrame(masks, index=entry.index).groupby(
+        [entry.event_no, entry.fin_heat], observed=True, sort=False
+    )
+    return counts.transform("sum")
+
+
+def flag_matrix(data, checkers, timings=None):
+    # evaluates the conditions of all the (name, checker) pairs given together, sharing common
+    # expressions between them.  Returns a boolean frame of entry rows x check names, leaving
+    # out any check whose condition failed.  If a timings dict is passed, the seconds spent on
+    # each condition are stored in it
+    expressions = Expressions(data)
+    flags = {}
+    for name, checker in checkers:
+        start = time.perf_counter()
+        try:
+            flags[name] = checker.flags(data, expressions)
+        except (ValueError,) as ex:
+            logger.error(f"Failed to run checker {name} with exception: {ex}")
+        if timings is not None:
+            timings[name] = time.perf_counter() - start
+    return pd.DataFrame(flags, index=data["entry"].index, dtype=bool)
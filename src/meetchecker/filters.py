@@ -0,0 +1,117 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# checker params restricting a single check to some of the swims, eg. `team_filter: RC`
+FILTER_PARAMS = ["team_filter", "event_filter", "session_filter"]
+
+
+def parse_numbers(spec):
+    # event / session numbers from eg. 7, "1-20", "1-20,25" or a list of any of those
+    if spec is None:
+        return None
+    if isinstance(spec, (list, tuple, set)):
+        parts = spec
+    else:
+        parts = str(spec).split(",")
+    numbers = set()
+    for part in parts:
+        if isinstance(part, int):
+            numbers.add(part)
+            continue
+        low, _, high = str(part).strip().partition("-")
+        try:
+            numbers.update(range(int(low), int(high or low) + 1))
+        except ValueError:
+            raise ValueError(f"Invalid event / session numbers {spec!r}")
+    return frozenset(numbers)
+
+
+def parse_teams(spec):
+    # team abbreviations from eg. "RC", "RC,WH" or a list
+    if spec is None:
+        return None
+    if isinstance(spec, str):
+        spec = spec.split(",")
+    return frozenset(str(team).strip() for team in spec)
+
+
+class Filters:
+    # which swims to check, by team abbreviation, event number and session number (None for
+    # any).  For a whole run they are applied to the raw tables, so that the rows of other
+    # teams / events are dropped before any merging or calculation; for a single checker they
+    # become a mask over the entry rows it flags
+    def __init__(self, teams=None, events=None, sessions=None):
+        self.teams = parse_teams(teams)
+        self.events = parse_numbers(events)
+        self.sessions = parse_numbers(sessions)
+
+    @classmethod
+    def from_params(cls, params):
+        return cls(
+            teams=params.get("team_filter"),
+            events=params.get("event_filter"),
+            sessions=params.get("session_filter"),
+        )
+
+    def __bool__(self):
+        return any(f is not None for f in (self.teams, self.events, self.sessions))
+
+    def __repr__(self):
+        # stable, as it is part of the keys of cached check results
+        parts = [
+            f"{name}={sorted(values)}"
+            for name, values in vars(self).items()
+            if values is not None
+        ]
+        return f"Filters({', '.join(parts)})"
+
+    def session_event_ptrs(self, session_events):
+        if session_events is None:
+            raise ValueError("Filtering by session, but no sessions were loaded")
+        return session_events.event_ptr[session_events.sess_no.isin(self.sessions)]
+
+    def filter_tables(self, dataframes, session_events=None):
+        # the raw (parsed, not yet merged) tables with only the rows of the wanted swims
+        tables = dict(dataframes)
+        team, event = tables["team"], tables["event"]
+        if self.teams is not None:
+            team_nos = team.team_no[team.team_abbr.isin(self.teams)]
+            tables["athlete"] = tables["athlete"].loc[
+                tables["athlete"].team_no.isin(team_nos)
+            ]
+            tables["entry"] = tables["entry"].loc[
+                tables["entry"].ath_no.isin(tables["athlete"].ath_no)
+            ]
+            tables["relay"] = tables["relay"].loc[
+                tables["relay"].team_no.isin(team_nos)
+            ]
+        if self.events is not None:
+            event = event.loc[event.event_no.isin(self.events)]
+        if self.sessions is not None:
+            event = event.loc[
+                event.event_ptr.isin(self.session_event_ptrs(session_events))
+            ]
+        if self.events is not None or self.sessions is not None:
+            tables["event"] = event
+            for name in ["entry", "relay"]:
+                tables[name] = tables[name].loc[
+                    tables[name].event_ptr.isin(event.event_ptr)
+                ]
+        before = len(dataframes["entry"].index) + len(dataframes["relay"].index)
+        after = len(tables["entry"].index) + len(tables["relay"].index)
+        logger.info(f"Filtered to {after} of {before} swims with {self}")
+        return tables
+
+    def mask(self, data):
+        # True for the rows of data["entry"] that pass the filters
+        entry = data["entry"]
+        mask = entry.index.notna()
+        if self.teams is not None:
+            mask &= entry.team_abbr.isin(self.teams).to_numpy()
+        if self.events is not None:
+            mask &= entry.event_no.isin(self.events).to_numpy()
+        if self.sessions is not None:
+            event_ptrs = self.session_event_ptrs(data.get("sessions"))
+            mask &= entry.event_ptr.isin(event_ptrs).to_numpy()
+        return mask
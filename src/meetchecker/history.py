@@ -0,0 +1,202 @@
+import argparse
+from contextlib import closing
+import datetime
+import logging
+import pathlib
+import sqlite3
+
+import pandas as pd
+from rich.logging import RichHandler
+
+from meetchecker.datasourcing import READERS, get_data
+
+logger = logging.getLogger(__name__)
+
+# A store of athletes' times from past meets, so that checkers can compare swims with an
+# athlete's real history rather than only the seed time in the meet file.  It is a SQLite
+# file, holding each athlete's best time per event (distance, stroke and course) at each
+# meet.  Athletes are keyed by their registration number, which is the same in every meet's
+# database; only if they have none are they keyed by their athlete number and team, which
+# match only between meets run from the same database.  Meets are keyed by the resolved path
+# of their database, so meets with files of the same name in different directories are kept
+# apart, and re-adding a meet's database replaces its times.
+
+SCHEMA = """
+CREATE TABLE meets (
+    meet TEXT PRIMARY KEY,
+    swims INTEGER NOT NULL,
+    added TEXT NOT NULL
+);
+CREATE TABLE best_times (
+    athlete_key TEXT NOT NULL,
+    event_dist INTEGER NOT NULL,
+    event_stroke TEXT NOT NULL,
+    course TEXT NOT NULL,
+    meet TEXT NOT NULL REFERENCES meets (meet),
+    fin_time REAL NOT NULL,
+    PRIMARY KEY (athlete_key, event_dist, event_stroke, course, meet)
+);
+PRAGMA user_version = 3;
+"""
+SCHEMA_VERSION = 3
+SWIM_KEY = ["athlete_key", "event_dist", "event_stroke", "course"]
+
+
+def swim_keys(entry):
+    # athlete_key, event_dist, event_stroke and course (Y, S or L) for each swim, with no
+    # athlete_key for relays
+    reg_no = entry.reg_no.astype("string").str.strip()
+    ath_team = (
+        entry.ath_no.astype("Int64").astype("string")
+        + ":"
+        + entry.team_abbr.astype("string")
+    )
+    athlete_key = reg_no.where(reg_no.notna() & (reg_no != ""), ath_team)
+    return pd.DataFrame(
+        dict(
+            athlete_key=athlete_key.where(entry.ind_rel == "I"),
+            event_dist=entry.event_dist.astype("Int64"),
+            event_stroke=entry.event_stroke.astype("string"),
+            course=entry.fin_course.astype("string").str.strip().str.upper(),
+        ),
+        index=entry.index,
+    )
+
+
+def key_rows(keys):
+    # plain python values, which is all sqlite3 will bind
+    keys = keys.dropna()
+    return list(
+        zip(
+            keys.athlete_key.tolist(),
+            keys.event_dist.astype(int).tolist(),
+            keys.event_stroke.tolist(),
+            keys.course.tolist(),
+        )
+    )
+
+
+class HistoryStore:
+    # read_only stores (eg. for checkers) must already exist, rather than being created empty
+    def __init__(self, path, read_only=False):
+        self.path = pathlib.Path(path)
+        self.read_only = read_only
+        if read_only and not self.path.is_file():
+            raise ValueError(f"History store {self.path} does not exist")
+        try:
+            with closing(self.connect()) as con, con:
+                (version,) = con.execute("PRAGMA user_version").fetchone()
+                tables = con.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0]
+                if not tables and not read_only:
+                    con.executescript(SCHEMA)
+                    version = SCHEMA_VERSION
+        except sqlite3.DatabaseError as ex:
+            # eg. some other file given as the store
+            raise ValueError(f"History store {self.path} could not be opened: {ex}")
+        if version != SCHEMA_VERSION:
+            raise ValueError(
+                f"{self.path} is not a history store of this version of meetchecker, "
+                "re-create it with meethistory"
+            )
+
+    def connect(self):
+        # a connection per call, so that a store can be used from checker threads
+        if self.read_only:
+            return sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+        return sqlite3.connect(self.path)
+
+    def meets(self):
+        with closing(self.connect()) as con:
+            return [
+                meet for meet, in con.execute("SELECT meet FROM meets ORDER BY meet")
+            ]
+
+    def add_meet(self, meet, entry):
+        # the best time of every athlete in every individual event they finished at the meet
+        finished = entry.loc[
+            (entry.fin_stat.astype("string").fillna("") == "") & (entry.fin_time > 0)
+        ]
+        keys = swim_keys(finished).assign(fin_time=finished.fin_time).dropna()
+        best = keys.groupby(SWIM_KEY, observed=True).fin_time.min().reset_index()
+        rows = [
+            (*key, meet, fin_time)
+            for key, fin_time in zip(
+                key_rows(best[SWIM_KEY]), best.fin_time.astype(float).tolist()
+            )
+        ]
+        added = datetime.datetime.now().isoformat(timespec="seconds")
+        with closing(self.connect()) as con, con:
+            con.execute("DELETE FROM best_times WHERE meet = ?", (meet,))
+            con.execute(
+                "INSERT INTO meets (meet, swims, added) VALUES (?, ?, ?) "
+                "ON CONFLICT (meet) DO UPDATE SET swims = excluded.swims, "
+                "added = excluded.added",
+                (meet, len(rows), added),
+            )
+            con.executemany("INSERT INTO best_times VALUES (?, ?, ?, ?, ?, ?)", rows)
+        logger.info(f"Added {len(rows)} best times from {meet!r} to {self.path}")
+        return len(rows)
+
+    def best_times(self, entry, exclude_meet=None):
+        # each swim's athlete's best time for the event at any meet in the store (other than
+        # exclude_meet, eg. the one being checked), or nan; aligned with entry
+        keys = swim_keys(entry)
+        with closing(self.connect()) as con:
+            con.execute(
+                "CREATE TEMP TABLE wanted "
+                "(athlete_key TEXT, event_dist INTEGER, event_stroke TEXT, course TEXT)"
+            )
+            con.executemany(
+                "INSERT INTO wanted VALUES (?, ?, ?, ?)",
+                key_rows(keys.drop_duplicates()),
+            )
+            found = con.execute(
+                "SELECT athlete_key, event_dist, event_stroke, course, MIN(fin_time) "
+                "FROM wanted JOIN best_times "
+                "USING (athlete_key, event_dist, event_stroke, course) "
+                "WHERE meet IS NOT ? "
+                "GROUP BY athlete_key, event_dist, event_stroke, course",
+                (exclude_meet,),
+            ).fetchall()
+        best = pd.DataFrame(found, columns=SWIM_KEY + ["best_time"]).astype(
+            dict(
+                athlete_key="string",
+                event_dist="Int64",
+                event_stroke="string",
+                course="string",
+            )
+        )
+        return keys.merge(best, how="left", on=SWIM_KEY).best_time.set_axis(entry.index)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Add the times from meet databases to an athlete history store"
+    )
+    parser.add_argument("store", type=pathlib.Path, help="The history store file")
+    parser.add_argument("databases", type=pathlib.Path, nargs="+")
+    parser.add_argument(
+        "--reader",
+        choices=READERS,
+        default="mdb-export",
+        help="How to read the databases: mdb-export, or the in-process python reader",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(message)s",
+        datefmt="[%X]",
+        handlers=[RichHandler()],
+    )
+    store = HistoryStore(args.store)
+    for database in args.databases:
+        data = get_data(database, cache=None, reader=args.reader)
+        store.add_meet(data["meet"], data["entry"])
+
+
+if __name__ == "__main__":
+    main()
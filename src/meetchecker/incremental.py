@@ -0,0 +1,97 @@
+import logging
+import threading
+
+import pandas as pd
+
+from meetchecker.check import CheckResults
+from meetchecker.datasourcing import restrict_entries
+from meetchecker.utils import frame_digest
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalState:
+    # carries what run_checks needs from one run to the next in order to re-check only the
+    # swims which changed.  Rows are identified by a hash of their whole content rather than
+    # by their lane (event_no, fin_heat, fin_lane) or ath_no: a row-local check's results for
+    # a row depend only on that row's content (and the standards, records and config, which
+    # are fingerprinted), so this re-checks exactly the rows a lane-keyed diff would, and
+    # also copes with keys which are not unique, eg. unseeded swims all in heat 0, lane 0,
+    # or relays with no ath_no.  Any edit to a row makes it a new row to be checked, and the
+    # results of row-local checks for all other rows are reused.  Everything is re-checked
+    # when the time standards, records, sessions (as moving an event to another session
+    # changes none of its rows), checks config or entry columns change, or after a check
+    # failed on only some rows.  merge and failed may be called from several threads
+    def __init__(self):
+        self.fingerprint = None
+        self.row_keys = None
+        self.results = {}
+        self.checking_all = True
+        self._lock = threading.Lock()
+
+    def start(self, data, checks):
+        # returns data restricted to the rows needing a check, with a row_key column added
+        entry = data["entry"]
+        row_keys = pd.util.hash_pandas_object(entry, index=False)
+        fingerprint = (
+            frame_digest(data["time_standards"]),
+            frame_digest(data["records"]),
+            repr(checks),
+            tuple(entry.columns),
+        )
+        if data.get("sessions") is not None:
+            fingerprint += (frame_digest(data["sessions"]),)
+        if fingerprint != self.fingerprint:
+            logger.info("Checking every swim")
+            self.results = {}
+            changed = pd.Series(True, index=entry.index)
+            self.checking_all = True
+        else:
+            changed = ~row_keys.isin(self.row_keys)
+            logger.info(
+                f"Re-checking {changed.sum()} of {len(entry.index)} swims, "
+                "the rest are unchanged since the last run"
+            )
+            self.checking_all = False
+        self._next = dict(fingerprint=fingerprint, row_keys=row_keys, results={})
+        self._failed = set()
+        self._current_keys = row_keys.to_numpy()
+        check_data = restrict_entries(data, changed)
+        check_data["entry"] = check_data["entry"].assign(row_key=row_keys[changed])
+        return check_data
+
+    def merge(self, name, new_results):
+        # the check's results for every current row: new ones for the rows just checked,
+        # and the last run's for the rest, in entry order as a full run would give them
+        parts = [self.results.get(name), new_results]
+        combined = CheckResults.concat([part for part in parts if part is not None])
+        if not len(combined):
+            merged = combined
+        else:
+            current = pd.DataFrame(dict(row_key=self._current_keys))
+            merged = CheckResults(
+                current.merge(
+                    combined.frame.drop_duplicates("row_key", keep="last"),
+                    on="row_key",
+                )
+            )
+        with self._lock:
+            self._next["results"][name] = merged
+        return merged
+
+    def failed(self, name):
+        # a check failing on every row (eg. for a missing time standard) fails the same way
+        # until the config changes, but one failing on some rows leaves nothing to build on
+        if not self.checking_all:
+            logger.info(f"Check {name} failed, will check every swim next time")
+            with self._lock:
+                self._failed.add(name)
+
+    def finish(self):
+        if self._failed:
+            self.fingerprint = None
+            self.results = {}
+            return
+        self.fingerprint = self._next["fingerprint"]
+        self.row_keys = self._next["row_keys"]
+        self.results = self._next["results"]
@@ -0,0 +1,365 @@
+from collections import namedtuple
+from contextlib import contextmanager
+import datetime
+import logging
+import mmap
+import struct
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# An in-process reader for the Jet 4 (Access 2000+) databases used by Meet Manager, as an
+# alternative to running mdb-export.  It memory-maps the file and decodes only the tables and
+# columns asked for.  The page / row layouts follow the mdbtools format notes
+# (https://github.com/mdbtools/mdbtools/blob/dev/HACKING.md).  Anything it does not understand
+# raises MdbReaderError so that callers can fall back to mdb-export.  Values come back as
+# mdb-export prints them, eg. dates as text, so that either gives the same frames.
+
+PAGE_SIZE = 4096
+VERSION_OFFSET = 0x14
+CATALOG_TDEF_PAGE = 2
+CATALOG_TABLE_TYPE = 1
+
+DATA_PAGE = 0x01
+TDEF_PAGE = 0x02
+
+OFFSET_MASK = 0x1FFF
+DELETED_ROW = 0x8000
+OVERFLOW_ROW = 0x4000
+
+# jet 4 table definition offsets
+TDEF_NUM_VAR_COLS = 43
+TDEF_NUM_COLS = 45
+TDEF_NUM_REAL_IDX = 51
+TDEF_USAGE_MAP = 55
+TDEF_COLUMNS_START = 63
+TDEF_REAL_IDX_SIZE = 12
+TDEF_COLUMN_SIZE = 25
+
+# jet 4 data page offsets
+DATA_PAGE_OWNER = 4
+DATA_PAGE_NUM_ROWS = 12
+DATA_PAGE_ROW_OFFSETS = 14
+
+# column types
+BOOL = 0x01
+BYTE = 0x02
+INT = 0x03
+LONGINT = 0x04
+MONEY = 0x05
+FLOAT = 0x06
+DOUBLE = 0x07
+DATETIME = 0x08
+TEXT = 0x0A
+MEMO = 0x0C
+
+FIXED_FORMATS = {
+    BYTE: "<B",
+    INT: "<h",
+    LONGINT: "<i",
+    MONEY: "<q",
+    FLOAT: "<f",
+    DOUBLE: "<d",
+    DATETIME: "<d",
+}
+
+EPOCH = datetime.datetime(1899, 12, 30)
+# mdb-export's default date format, "%x %X" in the C locale
+DATE_FORMAT = "%m/%d/%y %H:%M:%S"
+
+Column = namedtuple("Column", "name type num var_num fixed_offset size is_fixed")
+TableDef = namedtuple("TableDef", "page num_var_cols columns usage_map")
+
+
+class MdbReaderError(Exception):
+    pass
+
+
+def u16(buf, offset):
+    return struct.unpack_from("<H", buf, offset)[0]
+
+
+def u32(buf, offset):
+    return struct.unpack_from("<I", buf, offset)[0]
+
+
+def decode_text(raw):
+    # text is UCS-2, optionally "compressed": a 0xff 0xfe prefix, then runs of single-byte
+    # characters, with each 0x00 byte toggling between compressed and uncompressed runs
+    raw = bytes(raw)
+    if raw[:2] != b"\xff\xfe":
+        return raw.decode("utf-16-le", errors="replace")
+    chars = []
+    compressed = True
+    i = 2
+    while i < len(raw):
+        if raw[i] == 0:
+            compressed = not compressed
+            i += 1
+        elif compressed:
+            chars.append(chr(raw[i]))
+            i += 1
+        else:
+            chars.append(raw[i : i + 2].decode("utf-16-le", errors="replace"))
+            i += 2
+    return "".join(chars)
+
+
+class MdbFile:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f, self.decoding("the file"):
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.mm) < PAGE_SIZE:
+            self.close()
+            raise MdbReaderError(f"{path} is too small to be a Jet database")
+        if self.mm[VERSION_OFFSET] == 0:
+            self.close()
+            raise MdbReaderError(f"{path} is a Jet 3 database, which is not supported")
+        self._catalog = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.mm.close()
+
+    @contextmanager
+    def decoding(self, what):
+        # the low level errors of a truncated or unexpected page or row become MdbReaderErrors
+        try:
+            yield
+        except (struct.error, IndexError, KeyError, ValueError, OverflowError) as ex:
+            raise MdbReaderError(
+                f"Unable to decode {what} in {self.path}: {ex}"
+            ) from ex
+
+    def page(self, page_no):
+        start = page_no * PAGE_SIZE
+        if start + PAGE_SIZE > len(self.mm):
+            raise MdbReaderError(f"Page {page_no} is beyond the end of {self.path}")
+        return self.mm[start : start + PAGE_SIZE]
+
+    def row_bounds(self, page, row):
+        raw = u16(page, DATA_PAGE_ROW_OFFSETS + 2 * row)
+        start = raw & OFFSET_MASK
+        end = (
+            PAGE_SIZE
+            if row == 0
+            else u16(page, DATA_PAGE_ROW_OFFSETS + 2 * (row - 1)) & OFFSET_MASK
+        )
+        if start > end:
+            raise MdbReaderError(f"Corrupt row offsets in {self.path}")
+        return start, end, raw
+
+    def row_at(self, pointer):
+        # a row pointer is the page number shifted left 8 bits, plus the row number
+        page = self.page(pointer >> 8)
+        start, end, _ = self.row_bounds(page, pointer & 0xFF)
+        return page[start:end]
+
+    def read_tdef(self, page_no):
+        # a table definition can span several pages, each linked to the next; after the first,
+        # only the bytes following each page's 8 byte header are part of the definition
+        page = self.page(page_no)
+        if page[0] != TDEF_PAGE:
+            raise MdbReaderError(f"Page {page_no} is not a table definition")
+        parts = [page]
+        next_page = u32(page, 4)
+        while next_page:
+            page = self.page(next_page)
+            parts.append(page[8:])
+            next_page = u32(page, 4)
+        tdef = b"".join(parts)
+
+        num_cols = u16(tdef, TDEF_NUM_COLS)
+        offset = TDEF_COLUMNS_START + u32(tdef, TDEF_NUM_REAL_IDX) * TDEF_REAL_IDX_SIZE
+        entries = []
+        for i in range(num_cols):
+            entry = offset + i * TDEF_COLUMN_SIZE
+            entries.append(
+                (
+                    tdef[entry],
+                    u16(tdef, entry + 5),
+                    u16(tdef, entry + 7),
+                    u16(tdef, entry + 21),
+                    u16(tdef, entry + 23),
+                    bool(tdef[entry + 15] & 0x01),
+                )
+            )
+        offset += num_cols * TDEF_COLUMN_SIZE
+        columns = []
+        for entry in entries:
+            name_len = u16(tdef, offset)
+            name = decode_text(tdef[offset + 2 : offset + 2 + name_len])
+            offset += 2 + name_len
+            columns.append(Column(name, *entry))
+        columns.sort(key=lambda column: column.num)
+        return TableDef(
+            page_no, u16(tdef, TDEF_NUM_VAR_COLS), columns, u32(tdef, TDEF_USAGE_MAP)
+        )
+
+    def data_pages(self, tdef):
+        usage_map = self.row_at(tdef.usage_map)
+        if usage_map[0] == 0:
+            # inline map: a start page, then a bitmap of the pages following it
+            yield from set_bits(usage_map[5:], u32(usage_map, 1))
+        elif usage_map[0] == 1:
+            # reference map: a list of pages, each holding a bitmap of the next block of pages
+            bits_per_page = (PAGE_SIZE - 4) * 8
+            for i in range((len(usage_map) - 1) // 4):
+                map_page = u32(usage_map, 1 + 4 * i)
+                if map_page:
+                    yield from set_bits(self.page(map_page)[4:], i * bits_per_page)
+        else:
+            raise MdbReaderError(f"Unknown usage map type {usage_map[0]}")
+
+    def rows(self, tdef):
+        for page_no in self.data_pages(tdef):
+            page = self.page(page_no)
+            if page[0] != DATA_PAGE or u32(page, DATA_PAGE_OWNER) != tdef.page:
+                continue
+            for row in range(u16(page, DATA_PAGE_NUM_ROWS)):
+                start, end, raw = self.row_bounds(page, row)
+                if raw & DELETED_ROW:
+                    # includes the real data of overflowed rows, read via their pointer
+                    continue
+                if raw & OVERFLOW_ROW:
+                    yield self.row_at(u32(page, start))
+                else:
+                    yield page[start:end]
+
+    def read_columns(self, tdef, names):
+        # returns a list of values for each named column, decoding nothing else
+        by_name = {column.name.lower(): column for column in tdef.columns}
+        missing = [name for name in names if name.lower() not in by_name]
+        if missing:
+            raise MdbReaderError(f"Columns {missing} not found")
+        fixed_rank = {}
+        for column in tdef.columns:
+            if column.is_fixed:
+                fixed_rank[column.num] = len(fixed_rank)
+        wanted = [by_name[name.lower()] for name in names]
+        for column in wanted:
+            if column.type not in FIXED_FORMATS and column.type not in (
+                BOOL,
+                TEXT,
+                MEMO,
+            ):
+                raise MdbReaderError(
+                    f"Column {column.name!r} has unsupported type {column.type:#x}"
+                )
+
+        values = [[] for _ in wanted]
+        for data in self.rows(tdef):
+            row_cols = u16(data, 0)
+            bitmask_size = (row_cols + 7) // 8
+            last = len(data) - 1
+            null_mask = data[last - bitmask_size + 1 :]
+            row_var_cols = 0
+            if tdef.num_var_cols:
+                row_var_cols = u16(data, last - bitmask_size - 1)
+            row_fixed_cols = row_cols - row_var_cols
+
+            for column, column_values in zip(wanted, values):
+                byte, bit = divmod(column.num, 8)
+                is_null = byte >= len(null_mask) or not null_mask[byte] & (1 << bit)
+                if column.type == BOOL:
+                    # booleans live in the null mask, and mdb-export prints them as 1 / 0
+                    column_values.append(int(not is_null))
+                    continue
+                if is_null:
+                    column_values.append(None)
+                elif column.is_fixed:
+                    if fixed_rank[column.num] >= row_fixed_cols:
+                        column_values.append(None)
+                        continue
+                    start = column.fixed_offset + 2
+                    column_values.append(
+                        self.fixed_value(column, data[start : start + column.size])
+                    )
+                else:
+                    if column.var_num >= row_var_cols:
+                        column_values.append(None)
+                        continue
+                    offsets_at = last - bitmask_size - 3 - 2 * column.var_num
+                    start = u16(data, offsets_at)
+                    end = u16(data, offsets_at - 2)
+                    column_values.append(self.var_value(column, data[start:end]))
+        return values
+
+    def fixed_value(self, column, raw):
+        value = struct.unpack_from(FIXED_FORMATS[column.type], raw)[0]
+        if column.type == MONEY:
+            return value / 10000
+        if column.type == DATETIME:
+            return (EPOCH + datetime.timedelta(days=value)).strftime(DATE_FORMAT)
+        return value
+
+    def var_value(self, column, raw):
+        if column.type == TEXT:
+            return decode_text(raw)
+        if column.type == MEMO:
+            return decode_text(self.memo_bytes(raw))
+        raise MdbReaderError(f"Column {column.name!r} is not a variable length type")
+
+    def memo_bytes(self, raw):
+        # 12 byte header: length (with flags in the top byte), a row pointer, then unused
+        length = u32(raw, 0)
+        flags, length = length & 0xFF000000, length & 0x00FFFFFF
+        if flags & 0x80000000:
+            return raw[12 : 12 + length]
+        if flags & 0x40000000:
+            return self.row_at(u32(raw, 4))[:length]
+        # spread over a chain of rows, each starting with a pointer to the next
+        parts = []
+        pointer = u32(raw, 4)
+        while pointer and sum(len(part) for part in parts) < length:
+            row = self.row_at(pointer)
+            pointer = u32(row, 0)
+            parts.append(row[4:])
+        return b"".join(parts)[:length]
+
+    @property
+    def catalog(self):
+        # table name (lower case) -> page of its table definition, from MSysObjects
+        if self._catalog is None:
+            tdef = self.read_tdef(CATALOG_TDEF_PAGE)
+            ids, names, types = self.read_columns(tdef, ["Id", "Name", "Type"])
+            self._catalog = {
+                name.lower(): id_ & 0x00FFFFFF
+                for id_, name, type_ in zip(ids, names, types)
+                if name and type_ is not None and type_ & 0x7F == CATALOG_TABLE_TYPE
+            }
+        return self._catalog
+
+    def read_table(self, table, columns):
+        with self.decoding(f"table {table!r}"):
+            page_no = self.catalog.get(table.lower())
+            if page_no is None:
+                raise MdbReaderError(f"Table {table!r} not found in {self.path}")
+            tdef = self.read_tdef(page_no)
+            values = self.read_columns(tdef, columns)
+        types = {column.name.lower(): column.type for column in tdef.columns}
+        df = pd.DataFrame(dict(zip(columns, values)), columns=columns)
+        for column in columns:
+            if types[column.lower()] == FLOAT:
+                # singles print (and so parse back from mdb-export's csv) as their shortest
+                # decimal form, eg. 65.41 rather than 65.41000366
+                df[column] = (
+                    df[column].astype(np.float32).astype(str).astype(np.float64)
+                )
+        return df
+
+
+def set_bits(bitmap, base):
+    for byte_no, byte in enumerate(bitmap):
+        if byte:
+            for bit in range(8):
+                if byte & (1 << bit):
+                    yield base + byte_no * 8 + bit
@@ -0,0 +1,103 @@
+from contextlib import contextmanager
+import datetime
+import json
+import logging
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # not available on windows
+    resource = None
+
+from meetchecker.utils import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+def peak_memory_mb():
+    # the peak resident memory of the process so far, where the platform can tell us
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macos bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class Stage:
+    def __init__(self, name):
+        self.name = name
+        self.seconds = None
+        self.rows = None
+        self.peak_memory_mb = None
+
+    def as_dict(self):
+        return dict(
+            name=self.name,
+            seconds=round(self.seconds, 4),
+            rows=self.rows,
+            peak_memory_mb=self.peak_memory_mb,
+        )
+
+
+class Profiler:
+    # times the stages of a run, with the rows each produced and the process's peak memory
+    # after each, for a JSON report of where a run spends its time
+    def __init__(self):
+        self.started = datetime.datetime.now()
+        self.start = time.perf_counter()
+        self.stages = []
+        self.checks = []
+
+    def report(self):
+        return dict(
+            started=self.started.isoformat(timespec="seconds"),
+            seconds=round(time.perf_counter() - self.start, 4),
+            peak_memory_mb=peak_memory_mb(),
+            stages=[stage.as_dict() for stage in self.stages],
+            checks=[
+                dict(
+                    name=timing.name, seconds=round(timing.seconds, 4), rows=timing.rows
+                )
+                for timing in self.checks
+            ],
+        )
+
+
+@contextmanager
+def stage(profiler, name):
+    # times the block as a stage of profiler (if not None); set .rows on the yielded Stage to
+    # record how many rows the stage produced
+    record = Stage(name)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        if profiler is not None:
+            record.seconds = time.perf_counter() - start
+            record.peak_memory_mb = peak_memory_mb()
+            profiler.stages.append(record)
+
+
+def write_json(obj, path):
+    with atomic_write(path) as f:
+        json.dump(obj, f, indent=2)
+
+
+class ProfileLog:
+    # a rolling log of the reports of the last max_runs runs, eg. to compare refreshes over a
+    # meet weekend; kept in memory and rewritten as a JSON list after every run
+    def __init__(self, path, max_runs=50):
+        self.path = path
+        self.max_runs = max_runs
+        self.runs = []
+        if path.exists():
+            try:
+                with open(path) as f:
+                    self.runs = json.load(f)[-max_runs:]
+            except ValueError:
+                logger.warning(f"Unable to read profile log {path}, starting a new one")
+
+    def add(self, report):
+        self.runs = (self.runs + [report])[-self.max_runs :]
+        write_json(self.runs, self.path)
@@ -3,7 +3,7 @@ import logging
 import pathlib
 
 
-from meetchecker.datasourcing import get_data_from_csvs
+from meetchecker.datasourcing import get_data_from_dump
 
 
 def parse_args():
@@ -57,8 +57,8 @@ def format_seconds_as_time(raw):
 
 
 def prepare(day1_path, day2_path):
-    day1 = get_data_from_csvs(day1_path)["entry"]
-    day2 = get_data_from_csvs(day2_path)["entry"]
+    day1 = get_data_from_dump(day1_path)["entry"]
+    day2 = get_data_from_dump(day2_path)["entry"]
 
     day1_subset = day1[day1.event_no >= 33]
     day2_subset = day2[["event_no", "athlete_name", "fin_time"]]
@@ -84,8 +84,8 @@ def prepare(day1_path, day2_path):
 
 
 def check(day2_path, manual_path):
-    day2 = get_data_from_csvs(day2_path)["entry"]
-    manual = get_data_from_csvs(manual_path)["entry"]
+    day2 = get_data_from_dump(day2_path)["entry"]
+    manual = get_data_from_dump(manual_path)["entry"]
 
     manual_subset = manual[["event_no", "athlete_name", "fin_time"]]
 
@@ -0,0 +1,102 @@
+import importlib
+from importlib.metadata import entry_points
+import inspect
+import logging
+
+from meetchecker.checkers.base import BaseChecker
+from meetchecker.color_wheel import ColorWheel
+from meetchecker.filters import FILTER_PARAMS
+
+logger = logging.getLogger(__name__)
+
+# installed packages can provide checkers under this entry point group, eg. in pyproject.toml
+#   [project.entry-points."meetchecker.checkers"]
+#   my_check = "my_package.my_module:Checker"
+# and checks configs can then name them as `checker: my_check`
+ENTRY_POINT_GROUP = "meetchecker.checkers"
+
+
+def plugin_entry_points():
+    return {ep.name: ep for ep in entry_points(group=ENTRY_POINT_GROUP)}
+
+
+def load_checker_class(checker, plugins):
+    # a check's `checker` is either the name of a plugin, or a module with a Checker class
+    if checker in plugins:
+        # a broken plugin (eg. a missing dependency, or a syntax error) is a config problem
+        # like any other, rather than stopping the rest of the config being checked
+        try:
+            cls = plugins[checker].load()
+        except Exception as ex:
+            raise ValueError(
+                f"Plugin {checker!r} failed to load: {type(ex).__name__}: {ex}"
+            )
+    else:
+        try:
+            module = importlib.import_module(checker)
+        except ModuleNotFoundError:
+            raise ValueError(f"Module {checker!r} not found")
+        cls = getattr(module, "Checker", None)
+        if cls is None:
+            raise ValueError(f"No Checker class defined in module {checker!r}")
+    if not (isinstance(cls, type) and issubclass(cls, BaseChecker)):
+        raise ValueError(f"{cls} is not a subclass of BaseChecker")
+    return cls
+
+
+def accepted_params(cls):
+    # the keyword params which the checker class (or its bases) read
+    accepted = {"name", "color", *FILTER_PARAMS}
+    for klass in cls.__mro__:
+        if "__init__" in vars(klass):
+            accepted.update(inspect.signature(klass.__init__).parameters)
+    return accepted - {"self", "kwargs"}
+
+
+class CheckerRegistry:
+    # resolves, validates and builds the checkers for a checks config once, so that every run
+    # (eg. each daemon refresh) reuses them.  All problems with the config are raised together
+    # as a ValueError, rather than surfacing as log lines part way through a run
+    def __init__(self, checks):
+        self.checks = checks
+        self.checkers = []
+        plugins = plugin_entry_points()
+        color_wheel = ColorWheel.from_checks(checks)
+        problems = []
+        for name, check_config in checks.items():
+            if not check_config.get("run", True):
+                logger.info(f"{name!r} is set not to run, skipping it")
+                continue
+            try:
+                checker = self.build(name, check_config, plugins)
+            except (ValueError, TypeError) as ex:
+                problems.append(f"{name}: {ex}")
+                continue
+            if checker.color is None:
+                checker.color = next(color_wheel)
+            self.checkers.append((name, checker))
+        if problems:
+            raise ValueError("Invalid checks config:\n  " + "\n  ".join(problems))
+
+    @property
+    def needs_sessions(self):
+        # whether any checker filters by session, for which the meet's sessions must be read
+        return any(checker.filters.sessions is not None for _, checker in self.checkers)
+
+    @classmethod
+    def of(cls, checks):
+        # run_checks accepts either a registry or a checks config to build one from
+        return checks if isinstance(checks, cls) else cls(checks)
+
+    @staticmethod
+    def build(name, check_config, plugins):
+        if "checker" not in check_config:
+            raise ValueError("No checker given")
+        cls = load_checker_class(check_config["checker"], plugins)
+        params = check_config.get("params") or {}
+        unknown = set(params) - accepted_params(cls)
+        if unknown:
+            # these are accepted through **kwargs, but nothing reads them
+            logger.warning(f"Check {name!r} does not use params {sorted(unknown)}")
+        # missing or unexpected params raise TypeError
+        return cls(name=name, **params)
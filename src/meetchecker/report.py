@@ -1,61 +1,53 @@
 import datetime
+import html
 import itertools
 from operator import attrgetter
 import textwrap
 
+from meetchecker.utils import LRUCache, atomic_write
 
-class LaneResultsHtmlAdapter:
-    def __init__(self, lane_results):
-        self.lane_results = lane_results
+TABLE_START = '<table class="meetchecker"><tbody>'
+TABLE_END = "</tbody></table>"
 
-    def generate_table(self):
-        out = []
-        out.append('<table class="meetchecker">')
-        out.append("<tbody>")
-        for event_no, event_records_iter in itertools.groupby(
-            self.lane_results, key=attrgetter("event_no")
-        ):
-            event_records = list(event_records_iter)
-            out.append('<tr class="event"><td colspan="5">')
-            out.append(
-                f"Event {event_records[0].event_no}: {event_records[0].event_name}"
-            )
-            out.append("</td></tr>")
+# the html of events rendered by create_html_reports, by the digest of their results, so
+# that a daemon refresh only renders the events whose results changed
+event_fragment_cache = LRUCache(max_entries=1000)
 
-            for fin_heat, heat_records_iter in itertools.groupby(
-                event_records, key=attrgetter("fin_heat")
-            ):
-                heat_records = list(heat_records_iter)
-                suspicious_heat = "suspicious" if len(heat_records) >= 3 else ""
 
+def render_event(event_records):
+    # the table rows of one event's lane results
+    out = []
+    out.append('<tr class="event"><td colspan="5">')
+    out.append(f"Event {event_records[0].event_no}: {event_records[0].event_name}")
+    out.append("</td></tr>")
+
+    for fin_heat, heat_records_iter in itertools.groupby(
+        event_records, key=attrgetter("fin_heat")
+    ):
+        # whole heats that look wrong are reported by the heat checkers (eg.
+        # all_in_heat_popped), as reasons on each of the heat's lanes
+        heat_records = list(heat_records_iter)
+        out.append('<tr class="heat"><td colspan="5" class="heat-title">')
+        out.append(f"Heat: {heat_records[0].fin_heat}")
+        out.append("</td></tr>")
+
+        for lane_result in heat_records:
+            out.append('<tr class="lane">')
+            out.append(f"<td>Lane {lane_result.fin_lane}</td>")
+            out.append(f"<td>{lane_result.athlete_name}</td>")
+            out.append(f"<td>{lane_result.team_abbr}</td>")
+            out.append(f"<td>{lane_result.fin_time:.2f}</td>")
+            out.append("</td></tr>")
+
+            out.append('<tr class="reasons"><td colspan="5"><ul>')
+            for name_reason in lane_result.name_reasons:
                 out.append(
-                    f'<tr class="heat {suspicious_heat}"><td colspan="5" class="heat-title">'
+                    f'<li class="reason">'
+                    f'<span class="checkname" style="color:{name_reason.color}">{name_reason.name}</span>: '
+                    f"{name_reason.reason}</li>"
                 )
-                out.append(f"Heat: {heat_records[0].fin_heat}")
-                if suspicious_heat:
-                    out.append(
-                        f"     Warning: {len(heat_records)} lanes with issues - could this be an incorrect file?"
-                    )
-                out.append("</td></tr>")
-
-                for lane_result in heat_records:
-                    out.append('<tr class="lane">')
-                    out.append(f"<td>Lane {lane_result.fin_lane}</td>")
-                    out.append(f"<td>{lane_result.athlete_name}</td>")
-                    out.append(f"<td>{lane_result.team_abbr}</td>")
-                    out.append(f"<td>{lane_result.fin_time:.2f}</td>")
-                    out.append("</td></tr>")
-
-                    out.append('<tr class="reasons"><td colspan="5"><ul>')
-                    for name_reason in lane_result.name_reasons:
-                        out.append(
-                            f'<li class="reason">'
-                            f'<span class="checkname" style="color:{name_reason.color}">{name_reason.name}</span>: '
-                            f"{name_reason.reason}</li>"
-                        )
-                    out.append("</ul></td></tr>")
-        out.append("</tbody></table>")
-        return "".join(out)
+            out.append("</ul></td></tr>")
+    return "".join(out)
 
 
 def inline_css():
@@ -169,18 +161,78 @@ def report_javascript(idle_duration=30):
     )
 
 
-def create_html_report(lane_results, meetfile, output):
+def create_html_reports(events, meetfile, output, reversed_output, cache=None):
+    # writes the report in event order to output and latest event first to reversed_output,
+    # from events of (digest, lane results) as CheckResults.by_event gives.  Each event is
+    # rendered once for both, or not at all if cache already holds its html
+    fragments = []
+    for digest, event_records in events:
+        fragment = cache.get(digest) if cache is not None else None
+        if fragment is None:
+            fragment = render_event(event_records)
+            if cache is not None:
+                cache.put(digest, fragment)
+        fragments.append(fragment)
+    write_html_report(fragments, meetfile, output)
+    write_html_report(reversed(fragments), meetfile, reversed_output)
+
+
+def write_html_report(event_fragments, meetfile, output):
+    # streamed to a temporary file an event at a time, which then replaces output whole
+    with atomic_write(output) as f:
+        f.write("<html><head>")
+        f.write(inline_css())
+        f.write("</head><body>")
+        f.write(report_header(meetfile))
+        f.write(TABLE_START)
+        f.writelines(event_fragments)
+        f.write(TABLE_END)
+        f.write(report_javascript())
+        f.write("</body></html>")
+
+
+def create_index_page(meets, output, title="Meet Manager data checks"):
+    # one page linking to the reports of many meets, eg. from a season batch run.  meets are
+    # dicts with the meet's database, report (and reversed report) file names relative to
+    # output, its swims and results counts, results per check, or an error if it failed
+    timestamp = str(datetime.datetime.now())
     out = []
     out.append("<html>")
     out.append("<head>")
     out.append(inline_css())
     out.append("</head>")
     out.append("<body>")
-    out.append(report_header(meetfile))
-    adapter = LaneResultsHtmlAdapter(lane_results)
-    out.append(adapter.generate_table())
-    out.append(report_javascript())
+    out.append(f"<h1>{title}</h1>")
+    out.append(
+        f'<p><span class="breadcrumb-title">Generated:</span> '
+        f'<span class="breadcrumb-value">{timestamp}</span></p>'
+    )
+    out.append('<table class="meetchecker">')
+    out.append(
+        '<tr class="event"><td>Meet</td><td>Swims</td><td>Results</td>'
+        "<td>Results by check</td></tr>"
+    )
+    for meet in meets:
+        out.append('<tr class="lane">')
+        if meet.get("error"):
+            out.append(f"<td>{meet['database']}</td>")
+            error = html.escape(meet["error"])
+            out.append(f'<td colspan="3" class="suspicious">{error}</td>')
+        else:
+            out.append(
+                f"<td>{meet['database']} "
+                f'(<a href="{meet["report"]}">report</a>, '
+                f'<a href="{meet["reversed_report"]}">latest first</a>)</td>'
+            )
+            out.append(f"<td>{meet['swims']}</td>")
+            out.append(f"<td>{meet['results']}</td>")
+            by_check = ", ".join(
+                f"{name}: {count}" for name, count in meet["results_by_check"].items()
+            )
+            out.append(f"<td>{by_check}</td>")
+        out.append("</tr>")
+    out.append("</table>")
     out.append("</body>")
     out.append("</html>")
-    with open(output, "w") as f:
+    with atomic_write(output) as f:
         f.write("".join(out))
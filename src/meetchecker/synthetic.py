@@ -0,0 +1,213 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from meetchecker.datasourcing import COLUMNS
+
+# Builds the tables of a made up meet, in the shape mdb-export gives for a Meet Manager
+# database, so that meetchecker can be tested and benchmarked without a real meet file.
+# The times are rough but plausible, and a small share of swims (and whole heats) is
+# deliberately wrong, eg. big pops or missing pad times, so that the checks have work to do.
+
+TEAMS = ["RC", "WH", "SD", "CV", "LJ", "PB", "ES", "CH"]
+DISTANCES = [25, 50, 100, 200]
+STROKES = list("ABCDE")
+AGE_GROUPS = [(0, 8), (9, 10), (11, 12), (13, 14), (15, 18)]
+# seconds per 25 yards for each stroke, for the oldest age group
+PACE = dict(A=14.0, B=16.0, C=18.0, D=15.5, E=16.5)
+TIME_STANDARDS = dict(CNTY=0.95, LSC=0.9, WHO=0.88)
+RECORDS = {"2022pool": 0.8, "2022team": 0.83}
+LANES = 6
+
+
+def synthetic_tables(swims=1000, seed=0, lanes=LANES):
+    # a dict of table name -> csv text, as extract_tables_from_mdb returns, for a meet of
+    # roughly the given number of swims (individual swims plus relays)
+    rng = np.random.default_rng(seed)
+    n_events = min(200, max(10, swims // 100))
+    heats = max(1, math.ceil(swims / (n_events * lanes)))
+    n_athletes = max(50, swims // 4)
+
+    team = pd.DataFrame(
+        dict(
+            Team_no=np.arange(1, len(TEAMS) + 1),
+            Team_abbr=TEAMS,
+            Team_name=[f"{abbr} Swim Team" for abbr in TEAMS],
+        )
+    )
+    athlete = pd.DataFrame(
+        dict(
+            Ath_no=np.arange(1, n_athletes + 1),
+            Last_name=[f"Last{i}" for i in range(n_athletes)],
+            First_name=[f"First{i}" for i in range(n_athletes)],
+            Initial="",
+            Ath_Sex=rng.choice(["M", "F"], n_athletes),
+            Birth_date="01/01/12 00:00:00",
+            Reg_no=[f"REG{i:06d}" for i in range(n_athletes)],
+            Pref_name=np.where(rng.random(n_athletes) < 0.2, "Pref", ""),
+            Team_no=rng.integers(1, len(TEAMS) + 1, n_athletes),
+        )
+    )
+    event = make_events(n_events)
+    time_standards, records = make_tags(event)
+    entry, relay = make_swims(rng, event, athlete, heats, lanes)
+
+    frames = dict(
+        athlete=athlete,
+        team=team,
+        event=event,
+        tagnames=pd.DataFrame(dict(tag_ptr=[1, 2, 3], tag_name=list(TIME_STANDARDS))),
+        timestd=time_standards,
+        recordtags=pd.DataFrame(dict(tag_ptr=[1, 2], tag_name=list(RECORDS))),
+        records=records,
+        relay=relay,
+        entry=entry,
+    )
+    return {name: frames[name][COLUMNS[name]].to_csv(index=False) for name in COLUMNS}
+
+
+def make_events(n_events):
+    # every fifth event is a relay; genders alternate, strokes cycle every two events, and
+    # distance and age group every ten, so that up to 200 events are all different
+    numbers = np.arange(1, n_events + 1)
+    ages = [AGE_GROUPS[(n // 10) % len(AGE_GROUPS)] for n in numbers]
+    return pd.DataFrame(
+        dict(
+            Event_no=numbers,
+            Event_ptr=numbers + 100,
+            Ind_rel=np.where(numbers % 5 == 0, "R", "I"),
+            Event_sex=np.where(numbers % 2, "B", "G"),
+            Event_gender=np.where(numbers % 2, "M", "F"),
+            Event_dist=[DISTANCES[(n // 10) % len(DISTANCES)] for n in numbers],
+            Event_stroke=[STROKES[(n // 2) % len(STROKES)] for n in numbers],
+            Low_age=[low for low, _ in ages],
+            High_Age=[high for _, high in ages],
+        )
+    )
+
+
+def base_times(event):
+    # a typical time for each event, slower for the younger age groups
+    pace = event.Event_stroke.map(PACE) * (1 + (18 - event.High_Age) * 0.04)
+    return (event.Event_dist / 25 * pace).to_numpy()
+
+
+def make_tags(event):
+    # one time per standard (and record) for each different event, as in a real meet
+    event = event.drop_duplicates(
+        ["Event_gender", "Ind_rel", "Event_dist", "Event_stroke", "Low_age", "High_Age"]
+    )
+    keys = pd.DataFrame(
+        dict(
+            tag_gender=event.Event_gender,
+            tag_indrel=event.Ind_rel,
+            tag_dist=event.Event_dist,
+            tag_stroke=event.Event_stroke,
+            low_age=event.Low_age,
+            high_Age=event.High_Age,
+        )
+    )
+    base = base_times(event)
+    time_standards = pd.concat(
+        [
+            keys.assign(tag_ptr=tag_ptr, tag_time=(base * factor).round(2))
+            for tag_ptr, factor in enumerate(TIME_STANDARDS.values(), start=1)
+        ],
+        ignore_index=True,
+    )
+    records = pd.concat(
+        [
+            keys.assign(
+                tag_ptr=tag_ptr,
+                Record_year=2022,
+                Record_Holder="Record Holder",
+                Record_Holderteam=TEAMS[0],
+                Record_Time=(base * factor).round(2),
+            )
+            for tag_ptr, factor in enumerate(RECORDS.values(), start=1)
+        ],
+        ignore_index=True,
+    )
+    return time_standards, records
+
+
+def make_swims(rng, event, athlete, heats, lanes):
+    # one swim for every lane of every heat of every event
+    per_event = heats * lanes
+    event_index = np.repeat(np.arange(len(event.index)), per_event)
+    n = len(event_index)
+    fin_heat = np.tile(np.repeat(np.arange(1, heats + 1), lanes), len(event.index))
+    fin_lane = np.tile(np.arange(1, lanes + 1), len(event.index) * heats)
+
+    base = base_times(event)[event_index] * rng.uniform(0.9, 1.25, n)
+    seed_time = (base * rng.uniform(0.94, 1.05, n)).round(2)
+    fin_time = base * rng.normal(0.99, 0.015, n)
+    # the odd swim well off its seed time, in either direction
+    odd = rng.random(n)
+    fin_time = np.where(odd < 0.02, base * 0.75, fin_time)
+    fin_time = np.where(odd > 0.98, base * 1.3, fin_time)
+    # no seed time (NT) for some swims
+    seed_time[rng.random(n) < 0.05] = 0.0
+    # and the odd heat which looks like it got another heat's times, everyone well up
+    heat = event_index * heats + fin_heat - 1
+    wrong_heats = rng.random(len(event.index) * heats) < 0.01
+    fin_time = np.where(wrong_heats[heat], seed_time * 0.85, fin_time).round(2)
+
+    # DQs and scratches have no time
+    fin_stat = rng.choice(["", "Q", "R"], n, p=[0.94, 0.03, 0.03])
+    fin_time[fin_stat != ""] = 0.0
+
+    # three pad times close to the final time, some of them missing and a few way off
+    pads = fin_time[:, None] + rng.normal(0, 0.03, (n, 3))
+    pads[rng.random((n, 3)) < 0.1] = 0.0
+    pads[:, 2] += np.where(rng.random(n) < 0.01, 0.8, 0.0)
+    # with no pad times for a whole heat now and then
+    no_pad_heats = rng.random(len(event.index) * heats) < 0.01
+    pads[(fin_time == 0) | no_pad_heats[heat]] = 0.0
+    pads = pads.round(2)
+
+    swims = pd.DataFrame(
+        dict(
+            Event_ptr=event.Event_ptr.to_numpy()[event_index],
+            ActualSeed_time=seed_time,
+            Fin_heat=fin_heat,
+            Fin_lane=fin_lane,
+            Fin_stat=fin_stat,
+            Fin_Time=fin_time,
+            Fin_back1=pads[:, 0],
+            Fin_back2=pads[:, 1],
+            Fin_back3=pads[:, 2],
+            Fin_pad=np.where(rng.random(n) < 0.9, fin_time, 0.0),
+            fin_adjuststat="",
+        )
+    )
+    swims["Fin_heatplace"] = (
+        swims.Fin_Time.where(swims.Fin_Time > 0)
+        .groupby([swims.Event_ptr, swims.Fin_heat])
+        .rank(method="first")
+        .fillna(0)
+        .astype(int)
+    )
+
+    is_relay = event.Ind_rel.to_numpy()[event_index] == "R"
+    relay = swims.loc[is_relay].assign(
+        Relay_no=np.arange(1, is_relay.sum() + 1),
+        Team_no=rng.integers(1, len(TEAMS) + 1, is_relay.sum()),
+        Team_ltr=rng.choice(["A", "B"], is_relay.sum()),
+    )
+    genders = event.Event_gender.to_numpy()[event_index]
+    entry = swims.loc[~is_relay].assign(
+        Ath_no=pick_athletes(rng, athlete, genders[~is_relay]), Fin_course="Y"
+    )
+    return entry, relay
+
+
+def pick_athletes(rng, athlete, genders):
+    # an athlete of the right sex for each swim
+    ath_no = np.zeros(len(genders), dtype=int)
+    for sex in ["M", "F"]:
+        pool = athlete.Ath_no[athlete.Ath_Sex == sex].to_numpy()
+        swims = genders == sex
+        ath_no[swims] = rng.choice(pool, swims.sum())
+    return ath_no
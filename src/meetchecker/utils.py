@@ -1,5 +1,19 @@
+from collections import OrderedDict
+from contextlib import contextmanager
 import datetime
+import hashlib
 import inquirer
+import logging
+import os
+import pathlib
+import re
+import string
+import threading
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
 
 
 def emphasis(text):
@@ -25,3 +39,108 @@ def select_from_user(choices, message="Please select one", color="blue"):
 
 def approx_equals(float1, float2, epsilon=0.001):
     return abs(float1 - float2) <= epsilon
+
+
+# format specs which printf-style % formatting gives the same results for, so that numeric
+# columns can be formatted with them in one go (eg. "08.2f", but not ">10.2f" or ",.2f")
+PRINTF_SPEC = re.compile(r"\+?0?\d*(\.\d+)?[eEfFgG]")
+PRINTF_INT_SPEC = re.compile(r"\+?0?\d*d")
+CONVERSIONS = dict(r=repr, s=str, a=ascii)
+
+
+def format_column(values, spec, conversion):
+    # the str.format of every value of a column, vectorized where % formatting is the same
+    if conversion is None and values.dtype.kind in "fiu":
+        if PRINTF_SPEC.fullmatch(spec) or (
+            values.dtype.kind in "iu" and PRINTF_INT_SPEC.fullmatch(spec)
+        ):
+            return np.char.mod(f"%{spec}", values)
+    if conversion is None and not spec:
+        return values.astype(str)
+    convert = CONVERSIONS[conversion] if conversion else None
+    return [
+        format(convert(value) if convert else value, spec) for value in values.tolist()
+    ]
+
+
+def format_reasons(template, rows, columns=None):
+    # applies a str.format style template to every row at once.  Each field is looked up in
+    # columns (a Series aligned with rows, or a single value for all rows) and then in rows
+    # itself, formatted for the whole column in one go, and the pieces joined column-wise
+    columns = columns or {}
+    reasons = pd.Series("", index=rows.index, dtype=object)
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        if literal:
+            reasons = reasons + literal
+        if field is None:
+            continue
+        value = columns[field] if field in columns else rows[field]
+        if isinstance(value, pd.Series):
+            formatted = format_column(value.to_numpy(), spec, conversion)
+            reasons = reasons + pd.Series(formatted, index=rows.index, dtype=object)
+        else:
+            if conversion:
+                value = CONVERSIONS[conversion](value)
+            reasons = reasons + format(value, spec)
+    return reasons
+
+
+def frame_digest(dataframe):
+    # digest of a dataframe's values, index and column names
+    hashes = pd.util.hash_pandas_object(dataframe, index=True).to_numpy()
+    digest = hashlib.blake2b(hashes.tobytes(), digest_size=16)
+    digest.update("\x00".join(map(str, dataframe.columns)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+@contextmanager
+def atomic_write(path):
+    # a text file to write path through: it is written to a temporary file alongside path,
+    # which replaces path only once it is complete, so readers (eg. an auto-refreshing browser)
+    # see either the old file or the new one, never a partly written one
+    path = pathlib.Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class LRUCache:
+    # bounded mapping which evicts the least recently used entry once it holds more than
+    # max_entries.  Safe to use from several threads.  None is never cached, get() returns it
+    # for a miss
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                logger.debug(f"Evicted cache entry {evicted}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,21 @@
+import pandas as pd
+import pytest
+
+from meetchecker.check import SWIM_COLUMNS
+
+
+@pytest.fixture
+def checked():
+    # makes the rows a check named check_name would give for the swims in lanes, as
+    # (event_no, fin_lane) pairs all in heat 1
+    def make(check_name, lanes):
+        rows = pd.DataFrame(
+            [
+                dict.fromkeys(SWIM_COLUMNS, 0)
+                | dict(event_no=event_no, fin_heat=1, fin_lane=lane)
+                for event_no, lane in lanes
+            ]
+        )
+        return rows.assign(check_name=check_name, reason=f"{check_name} reason")
+
+    return make
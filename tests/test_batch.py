@@ -0,0 +1,81 @@
+import os
+import pathlib
+
+from meetchecker import batch
+from meetchecker.batch import find_databases, report_names
+from meetchecker.report import create_index_page
+
+
+def crash_on_a(database, output, checks, reader):
+    # a worker dying part way through a batch, eg. killed for using too much memory
+    if database.stem == "a":
+        os._exit(1)
+    return dict(
+        database=database.name,
+        report=output.name,
+        reversed_report=output.name,
+        swims=10,
+        results=1,
+        results_by_check=dict(big_pop=1),
+        seconds=0.1,
+    )
+
+
+def test_databases_are_found_in_a_directory_or_by_glob(tmp_path):
+    for name in ["b.mdb", "a.mdb", "notes.txt"]:
+        (tmp_path / name).touch()
+    assert [p.name for p in find_databases(tmp_path)] == ["a.mdb", "b.mdb"]
+    assert [p.name for p in find_databases(str(tmp_path / "b*"))] == ["b.mdb"]
+
+
+def test_index_links_to_every_meet(tmp_path):
+    meets = [
+        dict(
+            database="a.mdb",
+            report="a.html",
+            reversed_report="a_rev.html",
+            swims=100,
+            results=3,
+            results_by_check=dict(big_pop=2, relays=1),
+        ),
+        dict(database="b.mdb", error="ValueError: <unreadable>"),
+    ]
+    create_index_page(meets, tmp_path / "index.html")
+    page = (tmp_path / "index.html").read_text()
+    assert 'href="a.html"' in page and 'href="a_rev.html"' in page
+    assert "big_pop: 2, relays: 1" in page
+    assert "ValueError: &lt;unreadable&gt;" in page
+
+
+def test_databases_with_the_same_name_get_their_own_reports():
+    databases = [
+        pathlib.Path(path)
+        for path in ["spring/meet.mdb", "summer/meet.mdb", "summer/relays.mdb"]
+    ]
+    assert report_names(databases) == [
+        "spring_meet.html",
+        "summer_meet.html",
+        "relays.html",
+    ]
+    databases = [pathlib.Path("a/2023/meet.mdb"), pathlib.Path("b/2023/meet.mdb")]
+    assert report_names(databases) == ["2023_meet_1.html", "2023_meet_2.html"]
+
+
+def test_crashed_workers_fail_only_their_meets(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "check_meet", crash_on_a)
+    databases = [tmp_path / f"{name}.mdb" for name in "abcd"]
+    summaries = batch.batch(databases, tmp_path, checks={}, jobs=2)
+    assert [summary["database"] for summary in summaries] == [
+        "a.mdb",
+        "b.mdb",
+        "c.mdb",
+        "d.mdb",
+    ]
+    assert summaries[0]["error"].startswith("BrokenProcessPool")
+    assert all("error" not in summary for summary in summaries[1:])
+    assert [summary["report"] for summary in summaries[1:]] == [
+        "b.html",
+        "c.html",
+        "d.html",
+    ]
+    assert (tmp_path / "index.html").exists()
@@ -0,0 +1,26 @@
+import os
+
+from meetchecker.changes import ChangeDetector
+
+
+def test_detects_size_and_mtime_changes(tmp_path):
+    path = tmp_path / "meet.mdb"
+    path.write_bytes(b"abc")
+    detector = ChangeDetector(path)
+    assert detector.check()
+    assert not detector.check()
+    path.write_bytes(b"abcd")
+    assert detector.check()
+    assert not detector.check()
+
+
+def test_content_hash_ignores_touch(tmp_path):
+    path = tmp_path / "meet.mdb"
+    path.write_bytes(b"abc")
+    detector = ChangeDetector(path, use_hash=True)
+    assert detector.check()
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert not detector.check()
+    path.write_bytes(b"xyz")
+    assert detector.check()
@@ -0,0 +1,16 @@
+from meetchecker.check import CheckResults
+
+
+def test_results_are_grouped_by_lane_in_either_order(checked):
+    results = CheckResults.concat(
+        [
+            CheckResults.from_checked(checked("slow", [(2, 3), (1, 4)]), color="red"),
+            CheckResults.from_checked(checked("fast", [(1, 4)]), color="blue"),
+        ]
+    )
+    lanes = results.by_lane()
+    assert [(lane.event_no, lane.fin_lane) for lane in lanes] == [(1, 4), (2, 3)]
+    assert [nr.name for nr in lanes[0].name_reasons] == ["slow", "fast"]
+    assert lanes[0].name_reasons[1].color == "blue"
+    assert lanes[0].num_exceptions() == 2
+    assert [lane.event_no for lane in results.by_lane(reverse=True)] == [2, 1]
@@ -0,0 +1,96 @@
+import io
+
+import pandas as pd
+
+from meetchecker.checkers import (
+    popped_by_percent_threshold,
+    two_pad_times_and_inconsistent,
+)
+from meetchecker.core import run_checks
+from meetchecker.datasourcing import post_process_dataframes, tables_to_dataframes
+from meetchecker.synthetic import synthetic_tables
+from meetchecker.utils import LRUCache
+
+CHECKS = dict(
+    two_pads=dict(
+        checker="meetchecker.checkers.two_pad_times_and_inconsistent",
+        params=dict(threshold=0.02),
+    ),
+    big_pop=dict(
+        checker="meetchecker.checkers.popped_by_percent_threshold",
+        params=dict(threshold=10.0),
+    ),
+)
+
+
+def meet_data(change_relays=None):
+    tables = synthetic_tables(2000)
+    if change_relays:
+        relay = pd.read_csv(io.StringIO(tables["relay"]))
+        tables["relay"] = change_relays(relay).to_csv(index=False)
+    return post_process_dataframes(tables_to_dataframes(tables))
+
+
+def test_cached_checkers_skip_their_conditions(monkeypatch):
+    evaluated = []
+    for module in [two_pad_times_and_inconsistent, popped_by_percent_threshold]:
+        condition = module.Checker.condition
+        monkeypatch.setattr(
+            module.Checker,
+            "condition",
+            lambda self, data, expressions, condition=condition: evaluated.append(
+                self.name
+            )
+            or condition(self, data, expressions),
+        )
+    cache = LRUCache(max_entries=10)
+    run_checks(meet_data(), CHECKS, cache=cache)
+    assert evaluated == ["two_pads", "big_pop"]
+
+    # new relay letters change nothing either check reads, so neither is evaluated again,
+    # though the relays' names in their results are updated
+    letters = meet_data(lambda relay: relay.assign(Team_ltr="Z"))
+    evaluated.clear()
+    results = run_checks(letters, CHECKS, cache=cache)
+    assert evaluated == []
+    assert results.frame.equals(run_checks(letters, CHECKS).frame)
+    relays = results.frame.loc[results.frame.athlete_name.str.contains(" - ")]
+    assert len(relays.index) and relays.athlete_name.str.endswith(" - Z").all()
+
+    # whereas new relay times change what big_pop reads
+    times = meet_data(lambda relay: relay.assign(Fin_Time=relay.Fin_Time * 0.8))
+    evaluated.clear()
+    results = run_checks(times, CHECKS, cache=cache)
+    assert evaluated == ["big_pop"]
+    assert results.frame.equals(run_checks(times, CHECKS).frame)
+
+
+def test_checkers_run_on_threads_give_the_same_results():
+    checks = dict(
+        CHECKS,
+        relays=dict(checker="meetchecker.checkers.is_a_relay"),
+        missing_record=dict(
+            checker="meetchecker.checkers.set_new_record",
+            params=dict(record_name="no such record"),
+        ),
+        new_pool_record=dict(
+            checker="meetchecker.checkers.set_new_record",
+            params=dict(record_name="2022pool"),
+        ),
+    )
+    data = meet_data()
+    serial_timings, threaded_timings = [], []
+    serial = run_checks(data, checks, timings=serial_timings)
+    threaded = run_checks(data, checks, workers=4, timings=threaded_timings)
+    assert threaded.frame.equals(serial.frame)
+    # results are merged in the order the checks are configured
+    names = list(dict.fromkeys(threaded.frame.check_name))
+    assert names == ["two_pads", "big_pop", "relays", "new_pool_record"]
+
+    counts = threaded.frame.check_name.value_counts()
+    for timings in [serial_timings, threaded_timings]:
+        # one timing for every checker, the failed one included
+        assert [timing.name for timing in timings] == list(checks)
+        for timing in timings:
+            assert timing.rows == counts.get(timing.name, 0)
+            assert timing.seconds >= 0
@@ -0,0 +1,292 @@
+import os
+import subprocess
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from meetchecker import datasourcing
+from meetchecker.datasourcing import (
+    CATEGORICAL_COLUMNS,
+    COLUMNS,
+    INTEGER_COLUMNS,
+    TAG_KEYS,
+    TableCache,
+    common_calculated_fields,
+    dump_tables,
+    dump_tables_in_background,
+    event_metadata,
+    get_data,
+    get_data_from_dump,
+    load_snapshot,
+    map_tables,
+    parse_table,
+    post_process_dataframes,
+    save_snapshot,
+    stream_table,
+    tables_to_dataframes,
+    tag_times_by_swim,
+)
+from meetchecker.synthetic import synthetic_tables
+
+TEAM_CSV = 'Team_no,Team_abbr,Team_name,Team_short\n1,"RC ","Rancho ",R\n2,WH,Wahoo,W\n'
+
+
+def test_tables_to_dataframes_reuses_unchanged_tables():
+    cache = TableCache(max_entries=2)
+    first = tables_to_dataframes(dict(team=TEAM_CSV), cache=cache)["team"]
+    assert list(first.columns) == ["team_no", "team_abbr", "team_name"]
+    assert list(first.team_abbr) == ["RC", "WH"]
+    second = tables_to_dataframes(dict(team=TEAM_CSV), cache=cache)["team"]
+    assert second is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_table_cache_evicts_least_recently_used():
+    cache = TableCache(max_entries=2)
+    for digest in ("a", "b", "c"):
+        cache.put("team", digest, digest)
+    assert len(cache) == 2
+    assert cache.get("team", "a") is None
+    assert cache.get("team", "c") == "c"
+
+
+def test_pad_time_fields_treat_zero_as_missing():
+    df = pd.DataFrame(
+        dict(
+            fin_back1=[30.1, 0.0, np.nan, 0.0],
+            fin_back2=[30.5, 31.0, np.nan, 0.0],
+            fin_back3=[np.nan, 31.4, np.nan, 0.0],
+            actualseed_time=[31.0, 0.0, 35.0, np.nan],
+            fin_time=[30.3, 31.2, 0.0, 32.0],
+            event_sex="G",
+            low_age=0,
+            high_age=10,
+            event_dist=50,
+            event_stroke="A",
+            ind_rel="I",
+        )
+    )
+    df = common_calculated_fields(df)
+    assert list(df.num_pad_times) == [2, 2, 0, 0]
+    np.testing.assert_allclose(df.max_pad_time, [30.5, 31.4, np.nan, np.nan])
+    np.testing.assert_allclose(df.min_pad_time, [30.1, 31.0, np.nan, np.nan])
+    np.testing.assert_allclose(df.popped_by, [0.7, np.nan, np.nan, np.nan])
+
+
+def test_snapshot_round_trip_with_column_subset(tmp_path):
+    pytest.importorskip("pyarrow")
+    dataframes = tables_to_dataframes(synthetic_tables(500))
+    save_snapshot(dataframes, tmp_path)
+    with pytest.raises(ValueError):
+        save_snapshot(dataframes, tmp_path)
+
+    loaded = load_snapshot(tmp_path, columns=dict(team=["team_abbr"]))
+    assert list(loaded["team"].columns) == ["team_abbr"]
+    pd.testing.assert_frame_equal(loaded["team"], dataframes["team"][["team_abbr"]])
+    for name, df in dataframes.items():
+        if name != "team":
+            pd.testing.assert_frame_equal(loaded[name], df)
+
+    data = get_data_from_dump(tmp_path)
+    expected = post_process_dataframes(dataframes, meet=tmp_path.name)
+    pd.testing.assert_frame_equal(data["entry"], expected["entry"])
+
+
+def tag_swims():
+    # indexed like entry and relay rows concatenated, after filtering
+    return pd.DataFrame(
+        dict(
+            event_gender=["F", "F", "M", "X"],
+            ind_rel=["I", "I", "I", "R"],
+            event_dist=[50, 100, 50, 200],
+            event_stroke=["A", "A", "A", "A"],
+            low_age=[0, 0, 0, 9],
+            high_age=[8, 8, 8, 10],
+        ),
+        index=[3, 7, 12, 40],
+    )
+
+
+def tag_rows(*rows):
+    columns = TAG_KEYS + ["tag_name", "tag_time"]
+    return pd.DataFrame([dict(zip(columns, row)) for row in rows], columns=columns)
+
+
+def test_tag_times_are_joined_onto_each_swim():
+    tags = tag_rows(
+        ("F", "I", 50, "A", 0, 8, "AAA", 30.0),
+        ("F", "I", 50, "A", 0, 8, "BB", 35.0),
+        # a second time for the same event and tag: the first is used
+        ("F", "I", 50, "A", 0, 8, "AAA", 29.0),
+        ("X", "R", 200, "A", 9, 10, "BB", 140.0),
+    )
+    times = tag_times_by_swim(tag_swims(), tags, "tag_time")
+    assert list(times.columns) == ["AAA", "BB"]
+    assert times.index.equals(tag_swims().index)
+    np.testing.assert_allclose(times.AAA, [30.0, np.nan, np.nan, np.nan])
+    # events with no standard have nan
+    np.testing.assert_allclose(times.BB, [35.0, np.nan, np.nan, 140.0])
+
+
+def test_tag_times_without_any_tags():
+    times = tag_times_by_swim(tag_swims(), tag_rows(), "tag_time")
+    assert times.index.equals(tag_swims().index)
+    assert list(times.columns) == []
+
+
+def test_tag_times_line_up_with_entries_and_relays():
+    data = post_process_dataframes(tables_to_dataframes(synthetic_tables(500)))
+    entry, standards = data["entry"], data["standard_times"]
+    assert standards.index.equals(entry.index)
+    assert (entry.ind_rel == "R").any() and standards.notna().any().any()
+    tags = data["time_standards"].drop_duplicates(TAG_KEYS + ["tag_name"])
+    for i in entry.index[:: len(entry.index) // 20]:
+        swim = entry.loc[i]
+        matches = tags.loc[
+            (tags.tag_gender == swim.event_gender)
+            & (tags.tag_indrel == swim.ind_rel)
+            & (tags.tag_dist == swim.event_dist)
+            & (tags.tag_stroke == swim.event_stroke)
+            & (tags.low_age == swim.low_age)
+            & (tags.high_age == swim.high_age)
+        ]
+        expected = dict(zip(matches.tag_name, matches.tag_time))
+        for tag_name, time in standards.loc[i].items():
+            if tag_name in expected:
+                assert time == expected[tag_name]
+            else:
+                assert np.isnan(time)
+
+
+def test_normalized_dtypes_give_the_same_masks(monkeypatch):
+    dataframes = tables_to_dataframes(synthetic_tables(500))
+    entry = post_process_dataframes(dict(dataframes))["entry"]
+    monkeypatch.setattr(datasourcing, "normalize_dtypes", lambda dataframe: dataframe)
+    raw = post_process_dataframes(dict(dataframes))["entry"]
+
+    for column in CATEGORICAL_COLUMNS:
+        assert isinstance(entry[column].dtype, pd.CategoricalDtype), column
+    for column in INTEGER_COLUMNS:
+        assert entry[column].dtype.kind in "iu", column
+        assert entry[column].dtype.itemsize < raw[column].dtype.itemsize, column
+    for column in ["fin_time", "actualseed_time", "popped_by", "max_pad_time"]:
+        assert entry[column].dtype == "float64", column
+    pd.testing.assert_frame_equal(
+        entry.astype(raw.dtypes.to_dict()), raw, check_categorical=False
+    )
+
+    # as checker conditions compare them
+    assert (entry.fin_stat != "R").equals(raw.fin_stat != "R")
+    assert (entry.ind_rel == "I").equals(raw.ind_rel == "I")
+    assert (entry.ind_rel == "R").any() and (entry.ind_rel == "I").any()
+    assert entry.team_abbr.isin(["RC", "WH"]).equals(raw.team_abbr.isin(["RC", "WH"]))
+    assert (entry.event_no <= 10).equals(raw.event_no <= 10)
+
+
+@pytest.fixture
+def fake_mdb_export(tmp_path, monkeypatch):
+    # an mdb-export which prints the csv files in tables/, or with MDB_FAIL set prints
+    # MDB_OUTPUT and fails
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "mdb-export"
+    script.write_text(
+        "#!/bin/sh\n"
+        'if [ -n "$MDB_FAIL" ]; then printf "$MDB_OUTPUT"; exit 1; fi\n'
+        f'cat "{tmp_path}/tables/$2.csv"\n'
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    tables = synthetic_tables(300)
+    (tmp_path / "tables").mkdir()
+    dump_tables(tables, tmp_path / "tables")
+    return tables
+
+
+def test_streamed_tables_are_parsed_as_exported(fake_mdb_export, monkeypatch):
+    for table, text in fake_mdb_export.items():
+        pd.testing.assert_frame_equal(
+            stream_table("meet.mdb", table), parse_table(table, text)
+        )
+    streamed = get_data("meet.mdb", cache=None)
+    exported = get_data("meet.mdb", cache=TableCache())
+    pd.testing.assert_frame_equal(streamed["entry"], exported["entry"])
+
+    monkeypatch.setenv("MDB_FAIL", "1")
+    partial_outputs = [
+        "",
+        "Team_n",
+        "Team_no,Team_abbr,Team_name\\n1,RC,Ran",
+        'Team_no,Team_abbr,Team_name\\n1,"RC',
+    ]
+    for output in partial_outputs:
+        monkeypatch.setenv("MDB_OUTPUT", output)
+        with pytest.raises(subprocess.CalledProcessError):
+            stream_table("meet.mdb", "team")
+
+
+def test_tables_are_dumped_in_a_thread_which_is_waited_for(tmp_path):
+    tables = dict(team=TEAM_CSV)
+    thread = dump_tables_in_background(tables, tmp_path)
+    # the interpreter joins non-daemon threads before exiting
+    assert not thread.daemon
+    thread.join()
+    assert (tmp_path / "team.csv").read_text() == TEAM_CSV
+
+
+def test_map_tables_runs_up_to_max_workers_at_once():
+    lock = threading.Lock()
+    running, calls = [0], []
+
+    def export(mdb_filepath, table):
+        with lock:
+            running[0] += 1
+            calls.append((table, threading.current_thread().name, running[0]))
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return f"{mdb_filepath}:{table}"
+
+    tables = map_tables(export, "meet.mdb", max_workers=1)
+    assert list(tables) == list(COLUMNS)
+    assert list(tables.values()) == [f"meet.mdb:{table}" for table in COLUMNS]
+    # in order on the calling thread
+    assert [table for table, _, _ in calls] == list(COLUMNS)
+    assert {thread for _, thread, _ in calls} == {threading.current_thread().name}
+
+    calls.clear()
+    tables = map_tables(export, "meet.mdb", max_workers=2)
+    assert list(tables) == list(COLUMNS)
+    assert max(running for _, _, running in calls) == 2
+
+    calls.clear()
+    map_tables(export, "meet.mdb")
+    assert max(running for _, _, running in calls) > 2
+
+
+def test_event_names():
+    event = pd.DataFrame(
+        dict(
+            event_ptr=[101, 102, 103, 104, 105],
+            ind_rel=["I", "R", "R", "I", "I"],
+            event_sex=["B", "G", "B", "G", "B"],
+            event_dist=[50, 200, 200, 100, 25],
+            event_stroke=["A", "A", "E", "E", "D"],
+            low_age=[0, 9, 0, 15, 11],
+            high_age=[8, 10, 10, 18, 12],
+        )
+    )
+    names = event_metadata(event).event_name
+    assert list(names) == [
+        "Boys 8&U 50 Free",
+        "Girls 9-10 200 Free Relay",
+        "Boys 10&U 200 Medley Relay",
+        "Girls 15-18 100 IM",
+        "Boys 11-12 25 Fly",
+    ]
+    # and no events at all, eg. an empty meet
+    empty = event_metadata(event.iloc[:0])
+    assert len(empty.index) == 0 and "event_name" in empty
@@ -0,0 +1,59 @@
+import pandas as pd
+
+from meetchecker.checkers import (
+    all_in_heat_popped,
+    popped_by_percent_threshold,
+    set_new_record,
+)
+from meetchecker.engine import Expressions, flag_matrix
+
+
+def make_data():
+    entry = pd.DataFrame(
+        dict(
+            fin_stat=["", "R", "", "Q"],
+            fin_heat=[1, 1, 0, 2],
+            fin_time=[25.0, 25.0, 25.0, 25.0],
+            actualseed_time=[40.0, 40.0, 40.0, 40.0],
+            popped_by=[15.0, 15.0, 15.0, 15.0],
+        )
+    )
+    return dict(entry=entry, record_times=pd.DataFrame(index=entry.index))
+
+
+def test_shared_expressions_are_computed_once():
+    expressions = Expressions(make_data())
+    assert expressions.eligible is expressions.eligible
+    assert list(expressions.eligible) == [True, False, False, False]
+
+
+def test_flag_matrix_has_a_column_per_working_check():
+    checkers = [
+        ("big_pop", popped_by_percent_threshold.Checker(threshold=20)),
+        ("record", set_new_record.Checker(record_name="missing")),
+    ]
+    flags = flag_matrix(make_data(), checkers)
+    assert list(flags.columns) == ["big_pop"]
+    assert list(flags.big_pop) == [True, False, False, False]
+
+
+def test_heat_checker_flags_only_heats_where_everyone_matches():
+    entry = pd.DataFrame(
+        dict(
+            event_no=[1, 1, 1, 1, 1, 1, 2, 2],
+            fin_heat=[1, 1, 1, 2, 2, 2, 1, 1],
+            fin_lane=[1, 2, 3, 1, 2, 3, 1, 2],
+            fin_stat=["", "", "R", "", "", "", "", ""],
+            popped_by=[1.0, 2.0, -5.0, 1.0, -1.0, 1.0, 1.0, 1.0],
+        )
+    )
+    data = dict(entry=entry)
+    checker = all_in_heat_popped.Checker(min_swimmers=2)
+    flags = flag_matrix(data, [("all_popped", checker)]).all_popped
+    # the scratched swim does not count, heat 2 has a swim which did not pop, and event 2
+    # has too few swimmers only with min_swimmers=3
+    assert list(flags) == [True, True, False, False, False, False, True, True]
+    selected = checker.select(data, entry.loc[flags])
+    assert list(selected.heat_swimmers) == [2, 2, 2, 2]
+    checker = all_in_heat_popped.Checker(min_swimmers=3)
+    assert not flag_matrix(data, [("all_popped", checker)]).all_popped.any()
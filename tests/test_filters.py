@@ -0,0 +1,108 @@
+import pandas as pd
+import pytest
+
+from meetchecker import datasourcing
+from meetchecker.checkers import all_in_heat_popped, set_new_record
+from meetchecker.core import run_checks
+from meetchecker.datasourcing import (
+    get_data,
+    post_process_dataframes,
+    tables_to_dataframes,
+)
+from meetchecker.engine import flag_matrix
+from meetchecker.filters import Filters, parse_numbers
+from meetchecker.registry import CheckerRegistry
+from meetchecker.synthetic import synthetic_tables
+
+SESSION_EVENTS = pd.DataFrame(dict(event_ptr=[101, 102, 103, 104, 105], sess_no=1))
+
+
+def synthetic_dataframes():
+    return tables_to_dataframes(synthetic_tables(1000), cache=None)
+
+
+def test_parse_numbers():
+    assert parse_numbers(None) is None
+    assert parse_numbers(7) == {7}
+    assert parse_numbers("1-3,25") == {1, 2, 3, 25}
+    assert parse_numbers([4, "6-7"]) == {4, 6, 7}
+    with pytest.raises(ValueError):
+        parse_numbers("1-x")
+
+
+def test_filters_drop_other_swims_before_merging():
+    dataframes = synthetic_dataframes()
+    data = post_process_dataframes(
+        dataframes, filters=Filters(teams="RC,WH", events="1-10")
+    )
+    entry = data["entry"]
+    assert len(entry.index) > 0
+    assert set(entry.team_abbr) <= {"RC", "WH"}
+    assert set(entry.event_no) <= set(range(1, 11))
+
+    full = post_process_dataframes(synthetic_dataframes())["entry"]
+    wanted = full.loc[full.team_abbr.isin(["RC", "WH"]) & (full.event_no <= 10)]
+    assert len(entry.index) == len(wanted.index)
+
+
+def test_filter_by_session():
+    dataframes = synthetic_dataframes()
+    data = post_process_dataframes(
+        dataframes, filters=Filters(sessions=1), session_events=SESSION_EVENTS
+    )
+    assert set(data["entry"].event_ptr) == {101, 102, 103, 104, 105}
+    with pytest.raises(ValueError):
+        post_process_dataframes(synthetic_dataframes(), filters=Filters(sessions=1))
+
+
+def test_checker_team_filter():
+    data = post_process_dataframes(synthetic_dataframes())
+    params = dict(record_name="2022pool")
+    everyone = set_new_record.Checker(**params)
+    rc_only = set_new_record.Checker(**params, team_filter="RC")
+    flags = flag_matrix(data, [("everyone", everyone), ("rc_only", rc_only)])
+    assert flags.everyone.any()
+    assert flags.rc_only.equals(flags.everyone & (data["entry"].team_abbr == "RC"))
+
+
+def test_checks_filtering_by_session_have_the_sessions_read(monkeypatch):
+    monkeypatch.setattr(
+        datasourcing,
+        "stream_tables_from_mdb",
+        lambda path, max_workers=None: synthetic_dataframes(),
+    )
+    monkeypatch.setattr(
+        datasourcing, "read_session_events", lambda path, reader: SESSION_EVENTS
+    )
+    registry = CheckerRegistry(
+        dict(
+            first_session_relays=dict(
+                checker="meetchecker.checkers.is_a_relay",
+                params=dict(session_filter=1),
+            )
+        )
+    )
+    data = get_data("meet.mdb", cache=None, checks=registry)
+    results = run_checks(data, registry)
+    # event 5 is the only relay in session 1
+    assert len(results) and set(results.frame.event_no) == {5}
+
+
+def test_heat_checkers_count_only_filtered_swims():
+    entry = pd.DataFrame(
+        dict(
+            event_no=[1, 1, 1],
+            event_ptr=[101, 101, 101],
+            fin_heat=[1, 1, 1],
+            fin_lane=[1, 2, 3],
+            fin_stat=["", "", ""],
+            team_abbr=["RC", "RC", "WH"],
+            popped_by=[1.0, 2.0, -1.0],
+        )
+    )
+    data = dict(entry=entry)
+    everyone = all_in_heat_popped.Checker(min_swimmers=2)
+    rc_only = all_in_heat_popped.Checker(min_swimmers=2, team_filter="RC")
+    flags = flag_matrix(data, [("everyone", everyone), ("rc_only", rc_only)])
+    assert not flags.everyone.any()
+    assert list(flags.rc_only) == [True, True, False]
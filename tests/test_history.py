@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+
+from meetchecker import datasourcing
+from meetchecker.checkers import popped_vs_history
+from meetchecker.datasourcing import get_data, tables_to_dataframes
+from meetchecker.engine import flag_matrix
+from meetchecker.history import HistoryStore
+from meetchecker.synthetic import synthetic_tables
+
+
+def make_entry(fin_times, reg_nos=("A1", "", "A1"), course="Y"):
+    return pd.DataFrame(
+        dict(
+            reg_no=list(reg_nos),
+            ath_no=[1, 2, 1],
+            team_abbr=["RC", "WH", "RC"],
+            ind_rel=["I", "I", "I"],
+            event_dist=[50, 50, 100],
+            event_stroke=["A", "A", "A"],
+            fin_stat=["", "", ""],
+            fin_heat=[1, 1, 1],
+            fin_time=fin_times,
+            fin_course=course,
+        )
+    )
+
+
+def test_best_prior_times_come_from_other_meets(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite")
+    assert store.add_meet("spring", make_entry([30.0, 31.0, 70.0])) == 3
+    store.add_meet("summer", make_entry([29.0, 32.0, 0.0]))
+    # re-adding a meet replaces its times
+    store.add_meet("summer", make_entry([29.5, 32.0, 0.0]))
+    assert store.meets() == ["spring", "summer"]
+
+    entry = make_entry([25.0, 31.5, 69.0])
+    assert list(store.best_times(entry)) == [29.5, 31.0, 70.0]
+    assert list(store.best_times(entry, exclude_meet="summer")) == [30.0, 31.0, 70.0]
+    # unknown athletes have no history
+    other = make_entry([25.0, 31.5, 69.0], reg_nos=("B2", "B3", "B2"))
+    assert store.best_times(other).isna().all()
+    # nor are long course times compared with short course ones
+    assert store.best_times(make_entry([25.0, 31.5, 69.0], course="L")).isna().all()
+
+
+def test_checker_flags_big_improvements_on_history(tmp_path):
+    path = tmp_path / "history.sqlite"
+    HistoryStore(path).add_meet("spring", make_entry([30.0, 31.0, 70.0]))
+    entry = make_entry([25.0, 31.5, 69.0])
+    checker = popped_vs_history.Checker(history=str(path), threshold=10)
+    data = dict(entry=entry, meet="summer")
+    flags = flag_matrix(data, [("history", checker)]).history
+    assert list(flags) == [True, False, False]
+    assert list(checker.select(data, entry.loc[flags]).best_time) == [30.0]
+
+    # the checker only reads the store, which must exist
+    with pytest.raises(ValueError):
+        popped_vs_history.Checker(history=str(tmp_path / "missing.sqlite"))
+    assert not (tmp_path / "missing.sqlite").exists()
+
+
+def test_meets_with_databases_of_the_same_name_are_kept_apart(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        datasourcing,
+        "stream_tables_from_mdb",
+        lambda path, max_workers=None: tables_to_dataframes(synthetic_tables(200)),
+    )
+    spring = get_data(tmp_path / "spring" / "meet.mdb", cache=None)
+    summer = get_data(tmp_path / "summer" / "meet.mdb", cache=None)
+    assert spring["meet"] != summer["meet"]
+
+    store = HistoryStore(tmp_path / "history.sqlite")
+    store.add_meet(spring["meet"], spring["entry"])
+    store.add_meet(summer["meet"], summer["entry"].assign(fin_time=1.0))
+    assert store.meets() == sorted([spring["meet"], summer["meet"]])
+    # checking summer compares it with spring's times, and not summer's own
+    best = store.best_times(summer["entry"], exclude_meet=summer["meet"])
+    assert best.notna().any() and (best.dropna() > 1.0).all()
+
+
+def test_stores_that_are_not_sqlite_files_are_config_problems(tmp_path):
+    path = tmp_path / "history.sqlite"
+    path.write_text("not a database")
+    with pytest.raises(ValueError, match="could not be opened"):
+        popped_vs_history.Checker(history=str(path))
@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from meetchecker.check import SWIM_COLUMNS, CheckResults
+from meetchecker.incremental import IncrementalState
+
+
+def make_data(fin_times):
+    entry = pd.DataFrame(dict(ath_no=[1, 2, 3], fin_time=fin_times))
+    return dict(
+        entry=entry,
+        standard_times=pd.DataFrame(index=entry.index),
+        record_times=pd.DataFrame(index=entry.index),
+        time_standards=pd.DataFrame(dict(tag_name=["A"])),
+        records=pd.DataFrame(dict(tag_name=["R"])),
+    )
+
+
+def results(*key_reasons):
+    rows = pd.DataFrame(
+        [
+            dict(row_key=key, check_name="check", reason=reason)
+            for key, reason in key_reasons
+        ],
+        columns=SWIM_COLUMNS + ["check_name", "reason", "row_key"],
+    )
+    return CheckResults.from_checked(rows)
+
+
+def test_only_changed_rows_are_rechecked():
+    state = IncrementalState()
+    check_data = state.start(make_data([30.0, 31.0, 32.0]), {})
+    assert len(check_data["entry"]) == 3
+    keys = list(check_data["entry"].row_key)
+    state.merge("check", results((keys[0], "first"), (keys[2], "third")))
+    state.finish()
+
+    check_data = state.start(make_data([30.0, 35.0, 32.0]), {})
+    assert list(check_data["entry"].ath_no) == [2]
+    changed_key = check_data["entry"].row_key.iloc[0]
+    merged = state.merge("check", results((changed_key, "second")))
+    assert list(merged.frame.reason) == ["first", "second", "third"]
+    state.finish()
+
+    # a change in the checks config re-checks everything
+    check_data = state.start(make_data([30.0, 35.0, 32.0]), {"new": {}})
+    assert len(check_data["entry"]) == 3
+
+
+def test_a_partial_failure_from_another_thread_forces_a_full_check():
+    state = IncrementalState()
+    state.start(make_data([30.0, 31.0, 32.0]), {})
+    state.finish()
+    check_data = state.start(make_data([30.0, 35.0, 32.0]), {})
+    changed_key = check_data["entry"].row_key.iloc[0]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        executor.submit(state.failed, "broken").result()
+        merged = executor.submit(
+            state.merge, "check", results((changed_key, "second"))
+        ).result()
+    assert list(merged.frame.reason) == ["second"]
+    state.finish()
+    assert len(state.start(make_data([30.0, 35.0, 32.0]), {})["entry"]) == 3
+
+
+def test_moving_events_between_sessions_rechecks_everything():
+    sessions = pd.DataFrame(dict(event_ptr=[101, 102], sess_no=[1, 2]))
+    state = IncrementalState()
+    state.start(dict(make_data([30.0, 31.0, 32.0]), sessions=sessions), {})
+    state.finish()
+    unchanged = dict(make_data([30.0, 31.0, 32.0]), sessions=sessions)
+    assert len(state.start(unchanged, {})["entry"]) == 0
+    state.finish()
+    moved = dict(make_data([30.0, 31.0, 32.0]), sessions=sessions.assign(sess_no=1))
+    assert len(state.start(moved, {})["entry"]) == 3
@@ -0,0 +1,216 @@
+import io
+import struct
+
+import pandas as pd
+import pytest
+
+from meetchecker import mdbreader
+from meetchecker.datasourcing import read_mdb_table, read_table_csv
+from meetchecker.mdbreader import MdbFile, MdbReaderError
+
+PAGE_SIZE = mdbreader.PAGE_SIZE
+
+
+def tdef_page(columns, usage_map):
+    # columns are (name, type, size), fixed length columns first
+    page = bytearray(PAGE_SIZE)
+    page[0] = mdbreader.TDEF_PAGE
+    num_var = sum(1 for _, _, size in columns if not size)
+    struct.pack_into("<H", page, 43, num_var)
+    struct.pack_into("<H", page, 45, len(columns))
+    struct.pack_into("<I", page, 55, usage_map)
+    offset = 63
+    fixed_offset = var_num = 0
+    for num, (_, col_type, size) in enumerate(columns):
+        page[offset] = col_type
+        struct.pack_into("<HHH", page, offset + 5, num, var_num if not size else 0, num)
+        page[offset + 15] = 0x01 if size else 0x00
+        struct.pack_into("<HH", page, offset + 21, fixed_offset, size)
+        fixed_offset += size
+        var_num += 0 if size else 1
+        offset += 25
+    for i, (name, _, _) in enumerate(columns):
+        # alternate compressed and plain UCS-2 column names
+        encoded = (
+            b"\xff\xfe" + name.encode("latin-1") if i % 2 else name.encode("utf-16-le")
+        )
+        struct.pack_into("<H", page, offset, len(encoded))
+        page[offset + 2 : offset + 2 + len(encoded)] = encoded
+        offset += 2 + len(encoded)
+    return page
+
+
+def row_bytes(columns, values):
+    fixed = b""
+    var_data = b""
+    var_offsets = []
+    null_mask = bytearray((len(columns) + 7) // 8)
+    fixed_len = sum(size for _, _, size in columns)
+    for num, ((_, col_type, size), value) in enumerate(zip(columns, values)):
+        if value is not None:
+            null_mask[num // 8] |= 1 << (num % 8)
+        if size:
+            fmt = mdbreader.FIXED_FORMATS[col_type]
+            fixed += struct.pack(fmt, value or 0)
+        else:
+            var_offsets.append(2 + fixed_len + len(var_data))
+            if value is not None:
+                var_data += value.encode("utf-16-le")
+    var_offsets.append(2 + fixed_len + len(var_data))
+    offsets = b"".join(struct.pack("<H", o) for o in reversed(var_offsets))
+    return (
+        struct.pack("<H", len(columns))
+        + fixed
+        + var_data
+        + offsets
+        + struct.pack("<H", len(var_offsets) - 1)
+        + bytes(null_mask)
+    )
+
+
+def data_page(owner, rows):
+    # rows are (bytes, flags)
+    page = bytearray(PAGE_SIZE)
+    page[0] = mdbreader.DATA_PAGE
+    struct.pack_into("<I", page, 4, owner)
+    struct.pack_into("<H", page, 12, len(rows))
+    end = PAGE_SIZE
+    for i, (data, flags) in enumerate(rows):
+        start = end - len(data)
+        page[start:end] = data
+        struct.pack_into("<H", page, 14 + 2 * i, start | flags)
+        end = start
+    return page
+
+
+def usage_map(pages):
+    bitmap = bytearray(max(pages) // 8 + 1)
+    for page in pages:
+        bitmap[page // 8] |= 1 << (page % 8)
+    return struct.pack("<BI", 0, 0) + bytes(bitmap)
+
+
+CATALOG = [
+    ("Id", mdbreader.LONGINT, 4),
+    ("Type", mdbreader.INT, 2),
+    ("Name", mdbreader.TEXT, 0),
+]
+ENTRY = [
+    ("Ath_no", mdbreader.LONGINT, 4),
+    ("Fin_Time", mdbreader.FLOAT, 4),
+    ("Fin_heat", mdbreader.INT, 2),
+    ("Fin_stat", mdbreader.TEXT, 0),
+    ("Comment", mdbreader.TEXT, 0),
+]
+
+
+ATHLETE = [
+    ("Ath_no", mdbreader.LONGINT, 4),
+    ("Birth_date", mdbreader.DATETIME, 8),
+    ("Team_no", mdbreader.INT, 2),
+    ("Last_name", mdbreader.TEXT, 0),
+    ("First_name", mdbreader.TEXT, 0),
+    ("Initial", mdbreader.TEXT, 0),
+    ("Ath_Sex", mdbreader.TEXT, 0),
+    ("Reg_no", mdbreader.TEXT, 0),
+    ("Pref_name", mdbreader.TEXT, 0),
+]
+# the same athletes as mdb-export prints them
+ATHLETE_CSV = """Ath_no,Last_name,First_name,Initial,Ath_Sex,Birth_date,Reg_no,Pref_name,Team_no
+1,"Smith ","Ann",,"F","01/02/12 00:00:00","REG1","",3
+2,"Jones","Bob","J","M","06/15/10 12:30:00",,"Bobby",1
+"""
+
+
+@pytest.fixture
+def mdb_path(tmp_path):
+    header = bytearray(PAGE_SIZE)
+    header[mdbreader.VERSION_OFFSET] = 1
+    maps = data_page(
+        0, [(usage_map([3]), 0), (usage_map([5, 6]), 0), (usage_map([8]), 0)]
+    )
+    catalog_rows = [
+        (row_bytes(CATALOG, [4, 1, "Entry"]), 0),
+        (row_bytes(CATALOG, [7, 2, "Forms"]), 0),
+        (row_bytes(CATALOG, [7, 1, "Athlete"]), 0),
+    ]
+    athlete_rows = [
+        (
+            row_bytes(ATHLETE, [1, 40910.0, 3, "Smith ", "Ann", None, "F", "REG1", ""]),
+            0,
+        ),
+        (
+            row_bytes(
+                ATHLETE,
+                [2, 40344.520833333336, 1, "Jones", "Bob", "J", "M", None, "Bobby"],
+            ),
+            0,
+        ),
+    ]
+    entry_rows = [
+        (row_bytes(ENTRY, [10, 65.41, 1, "", "x"]), 0),
+        (row_bytes(ENTRY, [11, 70.0, 1, "Q", None]), mdbreader.DELETED_ROW),
+        (struct.pack("<I", (6 << 8) | 0), mdbreader.OVERFLOW_ROW),
+        (row_bytes(ENTRY, [13, None, 2, "R", None]), 0),
+    ]
+    overflowed = [
+        (row_bytes(ENTRY, [12, 31.2, 2, "DQ", "moved"]), mdbreader.DELETED_ROW)
+    ]
+    pages = [
+        header,
+        maps,
+        tdef_page(CATALOG, (1 << 8) | 0),
+        data_page(2, catalog_rows),
+        tdef_page(ENTRY, (1 << 8) | 1),
+        data_page(4, entry_rows),
+        data_page(4, overflowed),
+        tdef_page(ATHLETE, (1 << 8) | 2),
+        data_page(7, athlete_rows),
+    ]
+    path = tmp_path / "meet.mdb"
+    path.write_bytes(b"".join(bytes(page) for page in pages))
+    return path
+
+
+def test_reads_only_requested_columns(mdb_path):
+    with MdbFile(mdb_path) as mdb:
+        assert mdb.catalog == {"entry": 4, "athlete": 7}
+        df = mdb.read_table("ENTRY", ["Ath_no", "Fin_Time", "Fin_stat", "Fin_heat"])
+    assert list(df.columns) == ["Ath_no", "Fin_Time", "Fin_stat", "Fin_heat"]
+    assert list(df.Ath_no) == [10, 12, 13]
+    assert list(df.Fin_Time.fillna(-1)) == [65.41, 31.2, -1]
+    assert list(df.Fin_stat) == ["", "DQ", "R"]
+    assert list(df.Fin_heat) == [1, 2, 2]
+
+
+def test_missing_table_or_column_raises(mdb_path):
+    with MdbFile(mdb_path) as mdb:
+        with pytest.raises(MdbReaderError):
+            mdb.read_table("relay", ["Relay_no"])
+        with pytest.raises(MdbReaderError):
+            mdb.read_table("entry", ["Fin_lane"])
+
+
+def test_jet3_is_rejected(tmp_path):
+    path = tmp_path / "old.mdb"
+    path.write_bytes(bytes(PAGE_SIZE))
+    with pytest.raises(MdbReaderError):
+        MdbFile(path)
+
+
+def test_reads_tables_as_mdb_export_gives_them(mdb_path):
+    exported = read_table_csv(io.StringIO(ATHLETE_CSV), "athlete")
+    with MdbFile(mdb_path) as mdb:
+        read = read_mdb_table(mdb, "athlete")
+    pd.testing.assert_frame_equal(read, exported)
+    assert list(read.birth_date) == ["01/02/12 00:00:00", "06/15/10 12:30:00"]
+
+
+def test_undecodable_pages_raise_reader_errors(mdb_path):
+    # a table definition claiming more columns than it holds
+    data = bytearray(mdb_path.read_bytes())
+    struct.pack_into("<H", data, 4 * PAGE_SIZE + mdbreader.TDEF_NUM_COLS, 500)
+    mdb_path.write_bytes(bytes(data))
+    with MdbFile(mdb_path) as mdb:
+        with pytest.raises(MdbReaderError):
+            mdb.read_table("entry", ["Ath_no"])
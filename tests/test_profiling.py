@@ -0,0 +1,24 @@
+import json
+
+from meetchecker.profiling import ProfileLog, Profiler, stage
+
+
+def test_stages_are_timed_only_when_profiling():
+    profiler = Profiler()
+    with stage(profiler, "parse") as timed:
+        timed.rows = 10
+    with stage(None, "unprofiled") as timed:
+        timed.rows = 5
+    report = profiler.report()
+    assert [s["name"] for s in report["stages"]] == ["parse"]
+    assert report["stages"][0]["rows"] == 10
+    assert report["stages"][0]["seconds"] >= 0
+
+
+def test_profile_log_keeps_the_last_runs(tmp_path):
+    path = tmp_path / "log.json"
+    log = ProfileLog(path, max_runs=2)
+    for run in range(3):
+        log.add(dict(run=run))
+    assert [r["run"] for r in ProfileLog(path, max_runs=2).runs] == [1, 2]
+    assert json.loads(path.read_text()) == [dict(run=1), dict(run=2)]
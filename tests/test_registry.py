@@ -0,0 +1,54 @@
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from meetchecker import registry
+from meetchecker.registry import ENTRY_POINT_GROUP, CheckerRegistry
+
+
+def test_checkers_are_built_once_with_colors():
+    registry = CheckerRegistry(
+        dict(
+            big_pop=dict(
+                checker="meetchecker.checkers.popped_by_percent_threshold",
+                params=dict(threshold=20),
+            ),
+            relays=dict(
+                checker="meetchecker.checkers.is_a_relay", params=dict(color="green")
+            ),
+            skipped=dict(checker="no.such.module", run=False),
+        )
+    )
+    assert [name for name, _ in registry.checkers] == ["big_pop", "relays"]
+    big_pop, relays = (checker for _, checker in registry.checkers)
+    assert big_pop.threshold == 20 and big_pop.color is not None
+    assert relays.color == "green"
+    assert CheckerRegistry.of(registry) is registry
+
+
+def test_every_config_problem_is_reported_at_once():
+    with pytest.raises(ValueError) as excinfo:
+        CheckerRegistry(
+            dict(
+                missing=dict(checker="no.such.module"),
+                no_params=dict(checker="meetchecker.checkers.set_new_record"),
+            )
+        )
+    assert "missing: Module 'no.such.module' not found" in str(excinfo.value)
+    assert "no_params:" in str(excinfo.value)
+
+
+def test_plugins_that_fail_to_load_are_config_problems(monkeypatch):
+    broken = EntryPoint("broken", "no_such_plugin_package:Checker", ENTRY_POINT_GROUP)
+    monkeypatch.setattr(registry, "plugin_entry_points", lambda: dict(broken=broken))
+    with pytest.raises(ValueError) as excinfo:
+        CheckerRegistry(
+            dict(
+                broken=dict(checker="broken"),
+                missing=dict(checker="no.such.module"),
+            )
+        )
+    assert "broken: Plugin 'broken' failed to load: ModuleNotFoundError" in str(
+        excinfo.value
+    )
+    assert "missing: Module 'no.such.module' not found" in str(excinfo.value)
@@ -0,0 +1,44 @@
+import pytest
+
+from meetchecker import report
+from meetchecker.check import CheckResults
+from meetchecker.utils import LRUCache
+
+
+@pytest.fixture
+def results(checked):
+    def make(lanes):
+        return CheckResults.from_checked(checked("slow", lanes), color="red")
+
+    return make
+
+
+def test_only_changed_events_are_rendered_again(results, tmp_path, monkeypatch):
+    rendered = []
+    render_event = report.render_event
+    monkeypatch.setattr(
+        report,
+        "render_event",
+        lambda records: rendered.append(records[0].event_no) or render_event(records),
+    )
+    cache = LRUCache(max_entries=10)
+    outputs = dict(output=tmp_path / "r.html", reversed_output=tmp_path / "r_rev.html")
+
+    first = results([(1, 4), (2, 3)])
+    report.create_html_reports(first.by_event(), "meet", cache=cache, **outputs)
+    assert rendered == [1, 2]
+    text = outputs["output"].read_text()
+    assert text.index("Event 1:") < text.index("Event 2:")
+    reversed_text = outputs["reversed_output"].read_text()
+    assert reversed_text.index("Event 2:") < reversed_text.index("Event 1:")
+
+    second = results([(1, 4), (2, 3), (2, 5)])
+    report.create_html_reports(second.by_event(), "meet", cache=cache, **outputs)
+    assert rendered == [1, 2, 2]
+    assert "Lane 5" in outputs["output"].read_text()
+
+
+def test_heats_are_not_flagged_on_their_number_of_results(results):
+    fragment = report.render_event(results([(1, 3), (1, 4), (1, 5)]).by_lane())
+    assert fragment.count('<tr class="lane">') == 3
+    assert "Warning" not in fragment and "suspicious" not in fragment
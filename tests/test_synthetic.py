@@ -0,0 +1,43 @@
+from meetchecker.benchmark import CHECKS, benchmark
+from meetchecker.core import run_checks
+from meetchecker.datasourcing import (
+    COLUMNS,
+    dump_tables,
+    get_data_from_csvs,
+    tables_to_dataframes,
+)
+from meetchecker.synthetic import synthetic_tables
+
+
+def test_synthetic_meet_reads_through_the_csv_path(tmp_path):
+    tables = synthetic_tables(600, seed=1)
+    assert set(tables) == set(COLUMNS)
+    dump_tables(tables, tmp_path)
+    data = get_data_from_csvs(tmp_path)
+    assert 600 <= len(data["entry"].index) < 700
+    assert set(data["entry"].ind_rel) == {"I", "R"}
+
+    results = run_checks(data, CHECKS)
+    found = set(results.frame.check_name)
+    assert {"popped_county", "new_pool_record", "big_pop", "relays"} <= found
+
+
+def test_benchmark_times_every_stage():
+    report = benchmark(200, repeat=1)
+    assert report["swims"] >= 200
+    stages = report["seconds"]
+    assert {"read_csvs", "post_process_dataframes", "run_checks"} <= set(stages)
+    assert len([stage for stage in stages if stage.startswith("checker:")]) == len(
+        CHECKS
+    )
+
+
+def test_synthetic_tags_have_one_time_per_event():
+    tables = tables_to_dataframes(synthetic_tables(20000))
+    keys = ["tag_gender", "tag_indrel", "tag_dist", "tag_stroke", "low_age", "high_age"]
+    for table in ["timestd", "records"]:
+        assert not tables[table].duplicated(["tag_ptr", *keys]).any(), table
+    events = tables["event"][
+        ["event_gender", "ind_rel", "event_dist", "event_stroke", "low_age", "high_age"]
+    ]
+    assert not events.duplicated().any()
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from meetchecker.utils import LRUCache, atomic_write, format_reasons, frame_digest
+
+
+def test_format_reasons_matches_per_row_formatting():
+    rows = pd.DataFrame(
+        dict(
+            fin_time=[25.456, np.nan],
+            team_abbr=pd.Categorical(["RC", "WH"]),
+            num_pad_times=np.array([2, 3], dtype="int8"),
+        )
+    )
+    reasons = format_reasons(
+        "{team_abbr}: {fin_time:.2f} with {num_pad_times} pads over {threshold:.1f}",
+        rows,
+        dict(threshold=0.25),
+    )
+    expected = [
+        f"{row.team_abbr}: {row.fin_time:.2f} with {row.num_pad_times} pads over 0.2"
+        for row in rows.itertuples()
+    ]
+    assert list(reasons) == expected
+
+
+def test_format_reasons_takes_any_format_spec():
+    rows = pd.DataFrame(
+        dict(
+            fin_time=[1234.5678, np.nan],
+            improved_by=[0.125, -0.5],
+            team_abbr=pd.Categorical(["RC", "WH"]),
+            fin_lane=np.array([3, 10], dtype="int8"),
+        )
+    )
+    template = (
+        "{fin_time:>10.2f}|{fin_time:,.2f}|{fin_time:08.2f}|{improved_by:.1%}|"
+        "{improved_by:+.3f}|{team_abbr:>4}|{team_abbr!r}|{fin_lane:02d}|{fin_lane:<3}|"
+        "{meet!r}"
+    )
+    reasons = format_reasons(template, rows, dict(meet="spring"))
+    expected = [
+        template.format(**row._asdict(), meet="spring")
+        for row in rows.astype(object).itertuples()
+    ]
+    assert list(reasons) == expected
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_frame_digest_changes_with_values():
+    df = pd.DataFrame(dict(fin_time=[25.1, 26.2]))
+    assert frame_digest(df) == frame_digest(df.copy())
+    assert frame_digest(df) != frame_digest(df.assign(fin_time=[25.1, 26.3]))
+
+
+def test_atomic_write_only_replaces_complete_files(tmp_path):
+    path = tmp_path / "report.html"
+    with atomic_write(path) as f:
+        f.write("first")
+        # nothing is visible at the path until the write is complete
+        assert not path.exists()
+    assert path.read_text() == "first"
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as f:
+            f.write("half of the second")
+            raise RuntimeError("failed mid-write")
+    assert path.read_text() == "first"
+    assert [p.name for p in tmp_path.iterdir()] == ["report.html"]